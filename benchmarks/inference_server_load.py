@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from models.inference_backends import reference_landmarks
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client for the inference server, one connection per instance."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: bytes = b"",
+                      content_type: str = "application/json") -> tuple[int, bytes]:
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+def landmark_payloads(count: int, hands_per_request: int, seed: int = 0) -> list[bytes]:
+    samples = reference_landmarks(num_samples=count * hands_per_request, seed=seed).reshape(count, hands_per_request,
+                                                                                            21, 3)
+    return [json.dumps({"landmarks": sample.tolist(), "top_k": 3}).encode('utf-8') for sample in samples]
+
+
+def frame_payloads(video_path: Optional[str], count: int, width: int = 640, height: int = 480) -> list[bytes]:
+    import cv2
+
+    frames = []
+    if video_path:
+        capture = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(count)]
+    return [cv2.imencode('.jpg', frame)[1].tobytes() for frame in frames]
+
+
+async def run_client(client_id: int, host: str, port: int, path: str, content_type: str, payloads: list[bytes],
+                     deadline: float, max_requests: Optional[int], latencies: list, errors: list):
+    client = HttpClient(host, port)
+    await client.connect()
+    try:
+        sent = 0
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            payload = payloads[(client_id + sent) % len(payloads)]
+            start = time.perf_counter()
+            status, _ = await client.request("POST", path, payload, content_type)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+            sent += 1
+    finally:
+        await client.close()
+
+
+async def load_test(host: str, port: int, mode: str, concurrency: int, duration: float,
+                    requests_per_client: Optional[int], hands_per_request: int, video: Optional[str]) -> dict:
+    if mode == "landmarks":
+        path, content_type = "/predict", "application/json"
+        payloads = landmark_payloads(256, hands_per_request)
+    else:
+        path, content_type = "/predict/frame", "image/jpeg"
+        payloads = frame_payloads(video, 64)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(client_id, host, port, path, content_type, payloads, start + duration, requests_per_client,
+                   latencies, errors)
+        for client_id in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stats_client = HttpClient(host, port)
+    await stats_client.connect()
+    _, stats_body = await stats_client.request("GET", "/stats")
+    await stats_client.close()
+    server_stats = json.loads(stats_body)
+
+    values = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
+        "concurrency": concurrency,
+        "hands_per_request": hands_per_request if mode == "landmarks" else None,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+        "server": {
+            "mean_batch_size": server_stats["gauges"].get("mean_batch_size"),
+            "batches": server_stats["gauges"].get("batches"),
+            "batch_forward": server_stats["stages"].get("batch_forward"),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running inference_server.py on localhost.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--mode', choices=("landmarks", "frame"), default="landmarks")
+    parser.add_argument('--concurrency', type=int, default=16, help="Number of concurrent keep-alive clients.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument('--requests', type=int, default=None, help="Stop every client after this many requests.")
+    parser.add_argument('--hands', type=int, default=1, help="Hands per landmark request.")
+    parser.add_argument('--video', default=None, help="Encode frames of this video instead of synthetic ones.")
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    report = asyncio.run(load_test(args.host, args.port, args.mode, args.concurrency, args.duration, args.requests,
+                                   args.hands, args.video))
+    print(f"[INFO] {report['requests']} requests, {report['throughput_rps']} req/s, p50 {report['p50_ms']} ms, "
+          f"p99 {report['p99_ms']} ms, mean batch {report['server']['mean_batch_size']}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+    else:
+        print(output)
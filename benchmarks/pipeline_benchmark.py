@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from models.inference_backends import reference_landmarks
+from probability_history import ProbabilityHistory
+from sign_predictor import SignPredictor
+
+
+def summarize(name: str, latencies_ms: list[float]) -> dict:
+    latencies = np.asarray(latencies_ms)
+    total_seconds = latencies.sum() / 1000
+    return {
+        "stage": name,
+        "iterations": int(len(latencies)),
+        "throughput_per_s": round(len(latencies) / total_seconds, 2) if total_seconds > 0 else None,
+        "mean_ms": round(float(latencies.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p90_ms": round(float(np.percentile(latencies, 90)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "max_ms": round(float(latencies.max()), 4),
+    }
+
+
+def run_stage(name: str, stage, inputs: list, iterations: int, warmup: int = 5) -> dict:
+    """Calls stage(item) on inputs in a round-robin fashion and collects per-call latencies."""
+    for index in range(warmup):
+        stage(inputs[index % len(inputs)])
+
+    latencies = []
+    for index in range(iterations):
+        item = inputs[index % len(inputs)]
+        start = time.perf_counter()
+        stage(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"[INFO] {name}: p50 {np.percentile(latencies, 50):.3f} ms", file=sys.stderr)
+    return summarize(name, latencies)
+
+
+def synthetic_frames(count: int, width: int, height: int, seed: int = 0) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def recorded_frames(video_path: str, count: int) -> list[np.ndarray]:
+    capture = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+
+    if not frames:
+        raise RuntimeError(f"[Error] No frames could be read from {video_path}.")
+    return frames
+
+
+def create_headless_gui(signs_dict: dict, probability_history: ProbabilityHistory):
+    """Builds the real GestureGUI with its windows out of sight. Returns None when there is no display."""
+    import tkinter as tk
+    from gesture_gui import GestureGUI
+
+    try:
+        gui = GestureGUI(
+            toggle_recording=lambda: None,
+            record_single_frame=lambda: None,
+            toggle_live_view=lambda: None,
+            probability_history=probability_history,
+            signs_dict=signs_dict
+        )
+    except tk.TclError as error:
+        print(f"[WARN] GUI stages skipped, no display available: {error}", file=sys.stderr)
+        return None
+
+    gui.root.withdraw()
+    # update_plot skips rendering while the plot window is withdrawn, so it stays mapped, moved off-screen
+    gui.plot_window.plot_toplevel.geometry("+-10000+-10000")
+    gui.root.update_idletasks()
+    return gui
+
+
+def run_uncached_stage(predictor: SignPredictor, name: str, stage, inputs: list, iterations: int) -> dict:
+    """Runs a stage with the prediction cache switched off, so it measures the classifier itself."""
+    cache, predictor.prediction_cache = predictor.prediction_cache, None
+    try:
+        return run_stage(name, stage, inputs, iterations)
+    finally:
+        predictor.prediction_cache = cache
+
+
+def run_benchmarks(frames: list[np.ndarray], landmarks: np.ndarray, backend: str, iterations: int,
+                   include_gui: bool = True, cache_capacity: int = None) -> dict:
+    predictor = SignPredictor(backend=backend, cache_capacity=cache_capacity)
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    landmark_samples = list(landmarks.reshape(-1, 21, 3))
+    predictions = [predictor.predict_from_landmarks(sample) for sample in landmark_samples[:32]]
+
+    stages = [
+        run_stage("cv2.flip", lambda frame: cv2.flip(frame, 1), frames, iterations),
+        run_stage("cv2.cvtColor", lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), frames, iterations),
+        run_stage("hands.process", predictor.hands.process, rgb_frames, iterations),
+        run_uncached_stage(predictor, "predict_from_landmarks", predictor.predict_from_landmarks, landmark_samples,
+                           iterations),
+    ]
+    if predictor.prediction_cache is not None:
+        # Samples are cycled, so after the first pass this mostly measures cache hits
+        predictor.prediction_cache.clear()
+        stages.append(run_stage("predict_from_landmarks[cached]", predictor.predict_from_landmarks, landmark_samples,
+                                iterations))
+        stages[-1]["cache"] = predictor.prediction_cache.stats()
+    stages.append(run_uncached_stage(predictor, "predict_batch", predictor.predict_batch,
+                                     [landmarks.reshape(-1, 21, 3)], max(iterations // 10, 1)))
+    stages[-1]["samples_per_call"] = int(len(landmarks))
+
+    history = ProbabilityHistory(predictor.signs_dict.values())
+    gui = create_headless_gui(predictor.signs_dict, history) if include_gui else None
+    if gui is not None:
+        def display(frame):
+            # Frames are cycled, so the same object comes back and would be skipped as unchanged
+            gui.last_displayed_frame = None
+            gui.display_image(frame)
+            gui.root.update_idletasks()
+
+        def update_table(prediction):
+            gui.update_result_table(prediction)
+            gui.root.update_idletasks()
+
+        def update_plot(prediction):
+            history.append_prediction(prediction)
+            gui.plot_window.update_plot(prediction)
+
+        stages += [
+            run_stage("GestureGUI.display_image", display, frames, iterations),
+            run_stage("GestureGUI.update_result_table", update_table, predictions, iterations),
+            run_stage("PlotWindow.update_plot", update_plot, predictions, iterations),
+        ]
+
+    def end_to_end(frame):
+        frame = cv2.flip(frame, 1)
+        probabilities = predictor.process_frame(frame)
+        if gui is not None:
+            if probabilities is not None:
+                history.append_prediction(probabilities)
+                gui.display_predictions(probabilities)
+            gui.display_image(frame)
+            gui.root.update_idletasks()
+
+    counters_before = predictor.metrics.snapshot()["counters"]
+    stages.append(run_stage("end_to_end", end_to_end, frames, iterations))
+    counters = predictor.metrics.snapshot()["counters"]
+    # Counted over the warmup calls too, without hands the stage skips the classifier and the table
+    for name in ("frames_inferred", "hands_detected"):
+        stages[-1][name] = counters.get(name, 0) - counters_before.get(name, 0)
+    if not stages[-1]["hands_detected"]:
+        print("[WARN] end_to_end: no hands were detected, it only measured MediaPipe and the display. "
+              "Use --video with a recording of signs.", file=sys.stderr)
+
+    if gui is not None:
+        gui.root.destroy()
+
+    return {"stages": stages}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Camera-free per-stage benchmark of the recognition pipeline.")
+    parser.add_argument('--video', default=None, help="Recorded video to take frames from instead of synthetic ones.")
+    parser.add_argument('--landmarks', default=None, help="Optional .npy file with (N, 21, 3) landmarks.")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--frames', type=int, default=30, help="Number of distinct frames to cycle through.")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--backend', default='torch')
+    parser.add_argument('--no-gui', action='store_true', help="Skip the Tk display, table and plot stages.")
+    parser.add_argument('--cache-size', type=int, default=None,
+                        help="Also time predict_from_landmarks with a prediction cache of this size.")
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    if args.video:
+        input_frames = recorded_frames(args.video, args.frames)
+    else:
+        input_frames = synthetic_frames(args.frames, args.width, args.height)
+
+    # Keep stdout clean for the JSON report, the app's own console output goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmarks(input_frames, reference_landmarks(args.landmarks), args.backend, args.iterations,
+                                 include_gui=not args.no_gui, cache_capacity=args.cache_size)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "cache_size": args.cache_size,
+        "frame_shape": list(input_frames[0].shape),
+        "frame_source": args.video or "synthetic",
+        **results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"[INFO] Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+import cv2
+
+from benchmarks.pipeline_benchmark import recorded_frames
+from sign_predictor import SignPredictor
+
+
+def run_mode(frames: list, backend: str, roi_padding: Optional[float], inference_width: Optional[int],
+             roi_refresh_interval: int) -> tuple[dict, list]:
+    """Runs a fresh predictor over the frames in order, as the live loop would. Returns its stats and top-1 labels."""
+    predictor = SignPredictor(backend=backend, inference_width=inference_width, roi_padding=roi_padding,
+                              roi_refresh_interval=roi_refresh_interval)
+    predictor.annotate_frames = False
+
+    top_labels = []
+    for frame in frames:
+        hands = predictor.process_hands(cv2.flip(frame, 1))
+        top_labels.append(max(hands[0]["predictions"], key=hands[0]["predictions"].get) if hands else None)
+
+    snapshot = predictor.metrics.snapshot()
+    counters = snapshot["counters"]
+    roi_attempts = sum(counters.get(name, 0) for name in ("roi_hits", "roi_misses", "roi_refreshes"))
+    stats = {
+        "mode": "full_frame" if roi_padding is None else "roi",
+        "roi_padding": roi_padding,
+        "frames": len(frames),
+        "hands_detected": counters.get("hands_detected", 0),
+        "hand_detection_rate": snapshot["hand_detection_rate"],
+        "mediapipe_calls": counters.get("mediapipe_calls", 0),
+        "mediapipe_calls_per_frame": round(counters.get("mediapipe_calls", 0) / len(frames), 4),
+        "roi_hits": counters.get("roi_hits", 0),
+        "roi_misses": counters.get("roi_misses", 0),
+        "roi_refreshes": counters.get("roi_refreshes", 0),
+        "roi_hit_rate": round(counters.get("roi_hits", 0) / roi_attempts, 4) if roi_attempts else None,
+        "mediapipe": snapshot["stages"].get("mediapipe"),
+    }
+    print(f"[INFO] {stats['mode']}: {stats['mediapipe_calls_per_frame']} MediaPipe calls per frame, "
+          f"ROI hit rate {stats['roi_hit_rate']}", file=sys.stderr)
+    return stats, top_labels
+
+
+def run_benchmarks(frames: list, backend: str, roi_padding: float, inference_width: Optional[int],
+                   roi_refresh_interval: int) -> dict:
+    full_frame, full_frame_labels = run_mode(frames, backend, None, inference_width, roi_refresh_interval)
+    roi, roi_labels = run_mode(frames, backend, roi_padding, inference_width, roi_refresh_interval)
+
+    # Frames where both modes found a hand and agree on the most likely sign
+    both = [(a, b) for a, b in zip(full_frame_labels, roi_labels) if a is not None and b is not None]
+    roi["top1_agreement"] = round(sum(a == b for a, b in both) / len(both), 4) if both else None
+    return {"modes": [full_frame, roi]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares MediaPipe on the hand ROI against full-frame detection.")
+    parser.add_argument('--video', required=True, help="Recorded video with hands in view, processed in order.")
+    parser.add_argument('--frames', type=int, default=300, help="Number of frames to read from the video.")
+    parser.add_argument('--roi-padding', type=float, default=0.25)
+    parser.add_argument('--roi-refresh-interval', type=int, default=10)
+    parser.add_argument('--inference-width', type=int, default=None)
+    parser.add_argument('--backend', default='torch')
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    input_frames = recorded_frames(args.video, args.frames)
+
+    # Keep stdout clean for the JSON report, the app's own console output goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmarks(input_frames, args.backend, args.roi_padding, args.inference_width,
+                                 args.roi_refresh_interval)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "frame_shape": list(input_frames[0].shape),
+        "frame_source": args.video,
+        **results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"[INFO] Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
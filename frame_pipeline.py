@@ -0,0 +1,305 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, NamedTuple, Optional
+
+import cv2
+
+from frame_scheduler import FrameScheduler, LoadShedder
+from metrics import Metrics, RateLimitedLogger
+from motion_gate import MotionGate
+
+logger = RateLimitedLogger(logging.getLogger(__name__))
+
+
+class LatestValueQueue:
+    """
+    Bounded queue that keeps only the newest items. When a consumer falls behind,
+    the oldest unread items are dropped instead of piling up.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self._items = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_latest_nowait(self) -> Optional[Any]:
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def clear(self):
+        with self._condition:
+            self._items.clear()
+
+
+class InferenceResult(NamedTuple):
+    """One output of an inference worker. reused marks the previous result republished for a static frame."""
+    frame: Any
+    probabilities: Optional[dict]
+    hands_landmarks: list
+    reused: bool = False
+
+
+class FpsCounter:
+    """Measures the rate of events over a sliding time window."""
+
+    def __init__(self, window: float = 2.0):
+        self.window = window
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._timestamps.append(now)
+            self._trim(now)
+
+    @property
+    def fps(self) -> float:
+        now = time.perf_counter()
+        with self._lock:
+            self._trim(now)
+            if len(self._timestamps) < 2:
+                return 0.0
+            elapsed = now - self._timestamps[0]
+            return (len(self._timestamps) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def _trim(self, now: float):
+        while self._timestamps and now - self._timestamps[0] > self.window:
+            self._timestamps.popleft()
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from the camera at the target rate (or as fast as it delivers them) and publishes the newest one."""
+
+    def __init__(self, camera: cv2.VideoCapture, output_queue: LatestValueQueue, metrics: Metrics,
+                 scheduler: FrameScheduler):
+        super().__init__(name="CaptureThread", daemon=True)
+        self.camera = camera
+        self.output_queue = output_queue
+        self.metrics = metrics
+        self.scheduler = scheduler
+        self.fps_counter = FpsCounter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            with self.metrics.time_stage("capture"):
+                ret, frame = self.camera.read()
+                if ret:
+                    frame = cv2.flip(frame, 1)
+
+            if not ret:
+                self.metrics.increment("camera_read_failures")
+                logger.warning("Camera read failed.")
+                self._stop_event.wait(0.1)
+                continue
+
+            self.output_queue.put(frame)
+            self.fps_counter.tick()
+
+            delay = self.scheduler.next_delay()
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class InferenceWorker(threading.Thread):
+    """
+    Runs the predictor on the newest captured frame while enabled, at most at the target rate,
+    and publishes InferenceResult tuples. Frames that arrive while a prediction is in progress are
+    dropped by the input queue, and the load shedder skips further frames while the UI falls behind.
+    With a motion gate, static frames do not run the predictor, the previous result is republished
+    marked as reused, at most every reuse_interval seconds.
+    """
+
+    def __init__(self, process_hands: Callable, input_queue: LatestValueQueue, output_queue: LatestValueQueue,
+                 scheduler: FrameScheduler, load_shedder: LoadShedder, motion_gate: Optional[MotionGate] = None,
+                 reuse_interval: float = 0.1):
+        super().__init__(name="InferenceWorker", daemon=True)
+        self.process_hands = process_hands
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.scheduler = scheduler
+        self.load_shedder = load_shedder
+        self.motion_gate = motion_gate
+        self.reuse_interval = reuse_interval
+        self.last_result = None
+        self.last_reuse_time = 0.0
+        self.fps_counter = FpsCounter()
+        self.enabled = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if not self.enabled.wait(0.1):
+                continue
+
+            frame = self.input_queue.get(timeout=0.1)
+            if frame is None or not self.enabled.is_set() or not self.load_shedder.should_process():
+                continue
+
+            if self.motion_gate is not None and self.last_result is not None \
+                    and not self.motion_gate.should_process(frame):
+                self.reuse_last_result()
+            else:
+                # The live view shares this frame, landmarks are drawn by the UI on its own copies
+                hands = self.process_hands(frame)
+                self.last_result = InferenceResult(frame, hands[0]["predictions"] if hands else None,
+                                                   [hand["landmarks"] for hand in hands])
+                self.output_queue.put(self.last_result)
+                self.fps_counter.tick()
+
+            overruns = self.scheduler.overruns
+            delay = self.scheduler.next_delay()
+            if self.scheduler.overruns > overruns:
+                logger.warning("Inference is slower than its target rate.")
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+    def reuse_last_result(self):
+        """Republishes the previous result for a static frame, paced so it does not flood the consumers."""
+        now = time.perf_counter()
+        if now - self.last_reuse_time >= self.reuse_interval:
+            self.last_reuse_time = now
+            self.output_queue.put(self.last_result._replace(reused=True))
+
+    def reset(self):
+        self.last_result = None
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class FramePipeline:
+    """
+    Capture -> inference -> display pipeline. The capture thread feeds two latest-value
+    queues: one for the live view and one for the inference worker, whose results are
+    consumed by the UI thread.
+
+    With process_options, inference runs in a child process built from those SignPredictor
+    options instead of calling process_hands.
+    """
+
+    def __init__(self, camera: cv2.VideoCapture, process_hands: Optional[Callable], metrics: Optional[Metrics] = None,
+                 target_capture_fps: Optional[float] = None, target_inference_fps: Optional[float] = None,
+                 max_ui_lag: float = 0.05, motion_gate: Optional[MotionGate] = None,
+                 process_options: Optional[dict] = None, ring_slots: int = 4):
+        self.metrics = metrics or Metrics()
+        self.display_queue = LatestValueQueue()
+        self.inference_queue = LatestValueQueue()
+        self.result_queue = LatestValueQueue()
+
+        # The UI loop polls at the capture rate, or every 10 ms when the capture rate is not limited
+        self.capture_scheduler = FrameScheduler(target_capture_fps)
+        self.inference_scheduler = FrameScheduler(target_inference_fps)
+        self.ui_scheduler = FrameScheduler(target_capture_fps, default_delay=0.01)
+        self.load_shedder = LoadShedder(max_lag=max_ui_lag)
+
+        self.capture_thread = CaptureThread(
+            camera, _FanOut(self.display_queue, self.inference_queue), self.metrics, self.capture_scheduler
+        )
+        if process_options is not None:
+            from process_inference import ProcessInferenceWorker
+
+            self.inference_worker = ProcessInferenceWorker(
+                process_options, self.inference_queue, self.result_queue, self.inference_scheduler,
+                self.load_shedder, self.metrics, motion_gate, ring_slots
+            )
+        else:
+            self.inference_worker = InferenceWorker(
+                process_hands, self.inference_queue, self.result_queue, self.inference_scheduler,
+                self.load_shedder, motion_gate
+            )
+        self.display_fps = FpsCounter()
+        # Rate at which inference results reach the UI, i.e. the end-to-end throughput
+        self.end_to_end_fps = FpsCounter()
+        self.register_metrics()
+
+    def start(self):
+        self.capture_thread.start()
+        self.inference_worker.start()
+
+    def stop(self):
+        self.capture_thread.stop()
+        self.inference_worker.stop()
+        for thread in (self.capture_thread, self.inference_worker):
+            if thread.is_alive():
+                thread.join(timeout=2.0)
+
+    def enable_inference(self, enabled: bool):
+        if enabled:
+            self.inference_queue.clear()
+            self.result_queue.clear()
+            self.inference_scheduler.reset()
+            self.inference_worker.reset()
+            self.inference_worker.enabled.set()
+        else:
+            self.inference_worker.enabled.clear()
+
+    def register_metrics(self):
+        self.metrics.register_gauge("capture_fps", lambda: round(self.capture_thread.fps_counter.fps, 2))
+        self.metrics.register_gauge("inference_fps", lambda: round(self.inference_worker.fps_counter.fps, 2))
+        self.metrics.register_gauge("display_fps", lambda: round(self.display_fps.fps, 2))
+        self.metrics.register_gauge("end_to_end_fps", lambda: round(self.end_to_end_fps.fps, 2))
+        self.metrics.register_gauge(
+            "frames_dropped",
+            lambda: self.display_queue.dropped + self.inference_queue.dropped + self.result_queue.dropped,
+            kind='counter'
+        )
+        self.metrics.register_gauge("frames_shed", lambda: self.load_shedder.shed_frames, kind='counter')
+        self.metrics.register_gauge("shedding_level", lambda: self.load_shedder.skip_level)
+        self.metrics.register_gauge("ui_lag_ms", lambda: round(self.load_shedder.lag * 1000, 2))
+        if self.inference_worker.motion_gate is not None:
+            gate = self.inference_worker.motion_gate
+            self.metrics.register_gauge("motion_skipped_frames", lambda: gate.skipped, kind='counter')
+            self.metrics.register_gauge("motion_skip_rate", lambda: round(gate.skip_rate, 4))
+        if hasattr(self.inference_worker, "ring_dropped"):
+            self.metrics.register_gauge("ring_frames_dropped", lambda: self.inference_worker.ring_dropped, kind='counter')
+
+    def stats(self) -> dict:
+        return {
+            "capture_fps": round(self.capture_thread.fps_counter.fps, 1),
+            "inference_fps": round(self.inference_worker.fps_counter.fps, 1),
+            "display_fps": round(self.display_fps.fps, 1),
+            "end_to_end_fps": round(self.end_to_end_fps.fps, 1),
+            "dropped_display": self.display_queue.dropped,
+            "dropped_inference": self.inference_queue.dropped,
+            "dropped_results": self.result_queue.dropped,
+            "shed_frames": self.load_shedder.shed_frames,
+            "shedding_level": self.load_shedder.skip_level,
+        }
+
+
+class _FanOut:
+    """Publishes every item to several queues, so one producer can feed multiple stages."""
+
+    def __init__(self, *queues: LatestValueQueue):
+        self.queues = queues
+
+    def put(self, item: Any):
+        for output_queue in self.queues:
+            output_queue.put(item)
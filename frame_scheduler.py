@@ -0,0 +1,78 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FrameScheduler:
+    """
+    Paces a loop to a target rate. The delay before the next iteration is computed from a
+    deadline, so the time the iteration itself took is compensated. When a loop overruns its
+    deadline it does not try to catch up with a burst of iterations.
+    """
+
+    def __init__(self, target_fps: Optional[float], default_delay: float = 0.0):
+        self.period = 1.0 / target_fps if target_fps else None
+        self.default_delay = default_delay
+        self.next_deadline = None
+        self.overruns = 0
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next iteration, call once at the end of every iteration."""
+        if self.period is None:
+            return self.default_delay
+
+        now = time.perf_counter()
+        self.next_deadline = (self.next_deadline or now) + self.period
+        if self.next_deadline < now:
+            self.overruns += 1
+            self.next_deadline = now
+        return self.next_deadline - now
+
+    def reset(self):
+        self.next_deadline = None
+
+
+class LoadShedder:
+    """
+    Skips inference on a growing share of frames while the UI loop lags behind its schedule,
+    and gradually returns to processing every frame once it keeps up again.
+    """
+
+    def __init__(self, max_lag: float = 0.05, max_skip: int = 8, smoothing: float = 0.2):
+        self.max_lag = max_lag
+        self.max_skip = max_skip
+        self.smoothing = smoothing
+        self.lag = 0.0
+        # Number of frames skipped between two processed ones, 0 means no shedding
+        self.skip_level = 0
+        self.shed_frames = 0
+        self._skipped_in_row = 0
+
+    @property
+    def shedding(self) -> bool:
+        return self.skip_level > 0
+
+    def report_lag(self, lag: float):
+        self.lag += self.smoothing * (max(lag, 0.0) - self.lag)
+
+        if self.lag > self.max_lag and self.skip_level < self.max_skip:
+            if not self.shedding:
+                logger.warning(f"UI loop lags {self.lag * 1000:.0f} ms behind schedule, shedding inference load.")
+            self.skip_level += 1
+            # Give the new level time to take effect before reacting again
+            self.lag = self.max_lag / 2
+        elif self.lag < self.max_lag / 4 and self.shedding:
+            self.skip_level -= 1
+            self.lag = self.max_lag / 2
+            if not self.shedding:
+                logger.info(f"UI loop keeps up again, stopped shedding ({self.shed_frames} frames shed so far).")
+
+    def should_process(self) -> bool:
+        if self._skipped_in_row >= self.skip_level:
+            self._skipped_in_row = 0
+            return True
+        self._skipped_in_row += 1
+        self.shed_frames += 1
+        return False
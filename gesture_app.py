@@ -1,11 +1,26 @@
+import logging
+import time
 import cv2
 
+from frame_pipeline import FramePipeline
+from metrics import Metrics, MetricsExporter
+from motion_gate import MotionGate
+from probability_history import ProbabilityHistory
+from session_recorder import SessionRecorder
 from sign_predictor import SignPredictor
 from gesture_gui import GestureGUI
 
 
+logger = logging.getLogger(__name__)
+
+
 class GestureApp:
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=0, backend='torch', metrics_dir=None, metrics_interval=5.0, show_overlay=False,
+                 plot_top_k=None, history_length=100, table_top_n=None, table_max_fps=None, display_max_fps=None,
+                 target_capture_fps=None, target_inference_fps=None, inference_width=None, roi_padding=None,
+                 motion_threshold=None, motion_refresh_interval=1.0, cache_capacity=None, cache_step=0.01,
+                 max_num_hands=1, inference_process=False, ring_slots=4, record_db=None, record_sign=None,
+                 record_author=None, record_batch_size=64, record_consent=0):
         """
         The main application class responsible for integrating the predictive model, camera, and GUI.
         Supports recording, displaying results, and updating the interface in real time.
@@ -15,7 +30,7 @@ class GestureApp:
 
         # App state and prediction tracking
         self.app_state = {"recording": False, "single_frame_mode": False, "live_view": True}
-        self.probability_tracker = {}
+        self.metrics = Metrics()
 
         # Initialize the camera
         print(f"[INFO] Initializing the camera at index {camera_index}...")
@@ -23,8 +38,33 @@ class GestureApp:
         if not self.camera.isOpened():
             raise RuntimeError(f"[Error] Failed to open camera at index {camera_index}.")
 
-        # Load prediction model
-        self.sign_predictor = SignPredictor()
+        if record_db and inference_process:
+            raise ValueError("[Error] Recording needs in-process inference, drop --inference-process.")
+
+        # Load prediction model. With an inference process, the child builds it and this process
+        # only needs the sign labels and the landmark drawing
+        self.sign_predictor = None
+        self.signs_dict = SignPredictor.default_signs_dict()
+        if not inference_process:
+            self.sign_predictor = SignPredictor(
+                backend=backend, metrics=self.metrics, inference_width=inference_width, roi_padding=roi_padding,
+                cache_capacity=cache_capacity, cache_step=cache_step, max_num_hands=max_num_hands
+            )
+            # Landmarks are drawn by the UI on every displayed frame, not on the frame being processed
+            self.sign_predictor.annotate_frames = False
+            self.signs_dict = self.sign_predictor.signs_dict
+
+        # Optional recording of the processed frames' landmarks as a labelled session
+        self.session_recorder = None
+        if record_db:
+            self.session_recorder = SessionRecorder(
+                record_db, record_sign, record_author, metrics=self.metrics, batch_size=record_batch_size,
+                consent=record_consent
+            )
+            self.sign_predictor.landmark_sink = self.session_recorder.record
+
+        self.probability_history = ProbabilityHistory(self.signs_dict.values(), history_length)
+        self.metrics.register_gauge("predictions", lambda: self.probability_history.total_appended, kind='counter')
 
         # Initialize GUI
         print("[INFO] Initializing GUI components...")
@@ -32,55 +72,142 @@ class GestureApp:
             toggle_recording = self.toggle_recording,
             record_single_frame = self.record_single_frame,
             toggle_live_view = self.toggle_live_view,
-            probability_tracker = self.probability_tracker,
-            signs_dict = self.sign_predictor.signs_dict
+            probability_history = self.probability_history,
+            signs_dict = self.signs_dict,
+            metrics = self.metrics,
+            show_overlay = show_overlay,
+            plot_top_k = plot_top_k,
+            table_top_n = table_top_n,
+            table_max_fps = table_max_fps,
+            display_max_fps = display_max_fps
         )
 
         self.video_label = self.gui.video_label
 
+        # Capture and inference run on background threads, the Tk loop only consumes their output.
+        # Optionally inference runs in a child process that reads frames from shared memory.
+        process_options = {
+            "backend": backend, "inference_width": inference_width, "roi_padding": roi_padding,
+            "cache_capacity": cache_capacity, "cache_step": cache_step, "max_num_hands": max_num_hands
+        } if inference_process else None
+        self.pipeline = FramePipeline(
+            self.camera, self.sign_predictor.process_hands if self.sign_predictor else None, self.metrics,
+            target_capture_fps=target_capture_fps, target_inference_fps=target_inference_fps,
+            motion_gate=MotionGate(motion_threshold, refresh_interval=motion_refresh_interval)
+            if motion_threshold is not None else None,
+            process_options=process_options, ring_slots=ring_slots
+        )
+        # Landmarks of the newest inference result, drawn on the live frames while recording
+        self.latest_landmarks = []
+        self.last_stats_time = time.perf_counter()
+        self.next_frame_due = None
+
+        # Optional periodic export of the metrics as JSON and Prometheus text files
+        self.metrics_exporter = MetricsExporter(self.metrics, metrics_dir, metrics_interval) if metrics_dir else None
+
         print("[INFO] All resources initialized successfully.")
 
     def run(self):
         print("[INFO] Starting application...")
+        self.pipeline.start()
+        if self.session_recorder:
+            self.session_recorder.start()
+        if self.metrics_exporter:
+            self.metrics_exporter.start()
         self.update_frame()
         self.gui.root.mainloop()
 
     def update_frame(self):
-        ret, frame = self.camera.read()
-        frame = cv2.flip(frame, 1)
+        # How late Tk ran this tick tells the load shedder whether the UI keeps up
+        if self.next_frame_due is not None:
+            self.pipeline.load_shedder.report_lag(time.perf_counter() - self.next_frame_due)
 
-        if not ret:
-            print("[WARN] Camera read failed.")
-            return
-
-        if self.app_state['recording']:
-            probabilities = self.sign_predictor.process_frame(frame)
+        result = self.pipeline.result_queue.get_latest_nowait()
+        # A reused result repeats one already shown, it is neither a new prediction nor end-to-end throughput
+        if result is not None and self.app_state['recording'] and not result.reused:
+            frame, probabilities, self.latest_landmarks, _ = result
+            self.pipeline.end_to_end_fps.tick()
 
             if probabilities is not None:
+                self.probability_history.append_prediction(probabilities)
                 self.gui.display_predictions(probabilities)
-                self.gui.last_processed_frame = frame.copy()
+                self.gui.last_processed_frame = self.annotate(frame, self.latest_landmarks)
 
                 if self.app_state["single_frame_mode"]:
                     self.stop_recording()
                     self.show_last_frame()
 
+        live_frame = self.pipeline.display_queue.get_latest_nowait()
+
         if self.app_state["live_view"]:
-            self.gui.display_image(frame)
+            # Every captured frame is shown, so the display rate does not depend on the inference rate.
+            # While recording, the newest result's landmarks are drawn on top of it
+            if live_frame is not None:
+                if self.app_state['recording']:
+                    live_frame = self.annotate(live_frame, self.latest_landmarks)
+                self.render(live_frame)
         elif self.gui.last_processed_frame is not None:
-            self.gui.display_image(self.gui.last_processed_frame)
+            # Unchanged last frame is skipped by the display surface
+            self.render(self.gui.last_processed_frame)
+
+        self.report_pipeline_stats()
+
+        # Refresh Loop, the delay compensates for the time this iteration took
+        delay = self.pipeline.ui_scheduler.next_delay()
+        self.next_frame_due = time.perf_counter() + delay
+        self.gui.video_label.after(max(1, int(delay * 1000)), lambda: self.update_frame())
+
+    def annotate(self, frame, hands_landmarks):
+        """Copy of the frame with the hands' landmarks drawn on it, frames are shared between the pipeline stages."""
+        if not hands_landmarks:
+            return frame
+        frame = frame.copy()
+        SignPredictor.draw_hand_landmarks(frame, hands_landmarks)
+        return frame
 
-        # Refresh Loop
-        self.gui.video_label.after(10, lambda: self.update_frame())
+    def render(self, frame):
+        start = time.perf_counter()
+        if self.gui.display_image(frame):
+            self.metrics.observe("render", (time.perf_counter() - start) * 1000)
+            self.pipeline.display_fps.tick()
+
+    def report_pipeline_stats(self, interval: float = 5.0, overlay_interval: float = 0.5):
+        now = time.perf_counter()
+        stats = None
+
+        if self.gui.show_overlay and now - self.gui.last_overlay_update >= overlay_interval:
+            stats = self.pipeline.stats()
+            hand_rate = self.metrics.snapshot()["hand_detection_rate"]
+            self.gui.update_overlay(
+                f"capture {stats['capture_fps']} fps | inference {stats['inference_fps']} fps | "
+                f"display {stats['display_fps']} fps\n"
+                f"end-to-end {stats['end_to_end_fps']} fps | hands {hand_rate if hand_rate is not None else '-'}"
+            )
+
+        if now - self.last_stats_time < interval:
+            return
+        self.last_stats_time = now
+        stats = stats or self.pipeline.stats()
+        logger.info("FPS capture: {capture_fps}, inference: {inference_fps}, display: {display_fps}, "
+                    "end-to-end: {end_to_end_fps} | dropped display: {dropped_display}, "
+                    "inference: {dropped_inference}, results: {dropped_results} | "
+                    "shed: {shed_frames} (level {shedding_level})".format(**stats))
+        if self.session_recorder:
+            logger.info("Recorder: {written} frames written, {dropped} dropped | queue depth: {queue_depth} "
+                        "(max {max_queue_depth}) | {rows_per_s} rows/s".format(**self.session_recorder.stats()))
 
     def start_recording(self):
         self.show_live_camera()
         self.app_state.update({"recording": True, "single_frame_mode": False})
+        self.latest_landmarks = []
+        self.pipeline.enable_inference(True)
         self.gui.record_button.config(text="Stop Recording")
         self.gui.highlight_video_frame("red")
         print("[INFO] Recording started.")
 
     def stop_recording(self):
         self.app_state.update({"recording": False, "single_frame_mode": False})
+        self.pipeline.enable_inference(False)
         self.gui.record_button.config(text="Start Recording")
         self.gui.highlight_video_frame("grey")
         print("[INFO] Recording finished.")
@@ -93,6 +220,8 @@ class GestureApp:
 
     def record_single_frame(self):
         self.app_state.update({"recording": True, "single_frame_mode": True})
+        self.latest_landmarks = []
+        self.pipeline.enable_inference(True)
         print("[INFO] Scheduled single-frame processing.")
 
     def show_live_camera(self):
@@ -113,6 +242,13 @@ class GestureApp:
             self.show_live_camera()
 
     def cleanup_resources(self):
+        print("[INFO] Stopping capture and inference threads...")
+        self.pipeline.stop()
+        if self.session_recorder and self.session_recorder.is_alive():
+            print("[INFO] Writing the recorded session...")
+            self.session_recorder.stop()
+        if self.metrics_exporter and self.metrics_exporter.is_alive():
+            self.metrics_exporter.stop()
         print("[INFO] Releasing camera resources...")
         self.camera.release()
         print("[INFO] Closing OpenCV windows...")
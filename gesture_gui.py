@@ -1,5 +1,7 @@
 import os
+import time
 import cv2
+import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
@@ -8,7 +10,9 @@ from plot_window import PlotWindow
 
 
 class GestureGUI:
-    def __init__(self, toggle_recording, record_single_frame, toggle_live_view, probability_tracker, signs_dict):
+    def __init__(self, toggle_recording, record_single_frame, toggle_live_view, probability_history, signs_dict,
+                 metrics=None, show_overlay=False, plot_top_k=None, table_top_n=None, table_max_fps=None,
+                 display_max_fps=None):
         # Create the main application window
         self.root = tk.Tk()
         self.root.geometry("800x1000")
@@ -36,18 +40,35 @@ class GestureGUI:
         #elf.video_label.pack()
         self.video_label.pack(fill=tk.BOTH, expand=True)
 
+        # Reusable display surface: one RGBA buffer, a PIL image sharing its memory and one PhotoImage
+        self.display_buffer, self.display_source, self.display_photo = None, None, None
+        self.last_displayed_frame, self.last_display_time = None, 0.0
+        self.display_min_interval = 1.0 / display_max_fps if display_max_fps else 0.0
+
+        # Optional performance overlay in the corner of the video
+        self.show_overlay = show_overlay
+        self.last_overlay_update = 0.0
+        self.overlay_label = tk.Label(self.video_frame, bg="black", fg="lime", font=("Consolas", 9), justify=tk.LEFT)
+        if show_overlay:
+            self.overlay_label.place(x=5, y=5)
+
         # Buttons
         self.create_buttons(toggle_recording, record_single_frame, toggle_live_view)
 
-        # Results table
+        # Results table, its rows are created once and updated in place
+        self.signs_dict = signs_dict
+        self.table_top_n = table_top_n
+        self.table_min_interval = 1.0 / table_max_fps if table_max_fps else 0.0
+        self.table_order, self.table_values = [], {}
+        self.pending_table_predictions, self.table_refresh_job, self.last_table_refresh = None, None, 0.0
         self.result_table = self.create_result_table()
 
         # Plot window and canvas
-        self.plot_window = PlotWindow(self.root, probability_tracker)
+        self.plot_window = PlotWindow(self.root, probability_history, top_k=plot_top_k)
 
         # Store references to external resources
         self.highlight_video_frame("gray")
-        self.signs_dict = signs_dict
+        self.metrics = metrics
         self.last_processed_frame = None
 
         self.root.protocol("WM_DELETE_WINDOW", self.plot_window.on_closing)
@@ -158,6 +179,11 @@ class GestureGUI:
         result_table.column("Sign", width=100, anchor=tk.CENTER, stretch=False)
         result_table.column("Probability", width=100, anchor=tk.CENTER, stretch=False)
 
+        # One row per sign, identified by the sign name. Rows start detached and are attached by the first update
+        for rank, sign in enumerate(self.signs_dict.values(), start=1):
+            result_table.insert("", tk.END, iid=sign, values=(rank, sign, "0.00"))
+            result_table.detach(sign)
+
         # result_table.pack(pady=10, ipadx=10)
         result_table.pack()
         return result_table
@@ -186,28 +212,91 @@ class GestureGUI:
         #self.video_frame.configure(style="VideoFrame.TFrame")
         self.video_frame.config(highlightbackground=color)
 
-    def display_image(self, frame):
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image = Image.fromarray(image)
-        image = ImageTk.PhotoImage(image)
-        self.video_label.configure(image=image)
-        self.video_label.image = image
+    def display_image(self, frame) -> bool:
+        """Shows a BGR frame. Returns False when it was skipped (unchanged frame or refresh rate cap)."""
+        if frame is self.last_displayed_frame:
+            return False
+
+        now = time.perf_counter()
+        if now - self.last_display_time < self.display_min_interval:
+            return False
+
+        height, width = frame.shape[:2]
+        if self.display_buffer is None or self.display_buffer.shape[:2] != (height, width):
+            self.create_display_surface(width, height)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self.display_buffer)
+        self.display_photo.paste(self.display_source)
+
+        self.last_displayed_frame, self.last_display_time = frame, now
+        return True
+
+    def create_display_surface(self, width: int, height: int):
+        self.display_buffer = np.empty((height, width, 4), dtype=np.uint8)
+        # RGBA images created with frombuffer map the array directly, so cvtColor writes are visible without a copy
+        self.display_source = Image.frombuffer("RGBA", (width, height), self.display_buffer, "raw", "RGBA", 0, 1)
+        self.display_photo = ImageTk.PhotoImage("RGBA", (width, height))
+        self.video_label.configure(image=self.display_photo)
+        self.video_label.image = self.display_photo
 
     def display_predictions(self, predictions):
         if not predictions:
             return
 
-        self.update_result_table(predictions)
-        self.plot_window.update_plot(predictions)
+        if self.metrics is None:
+            self.update_result_table(predictions)
+            self.plot_window.update_plot(predictions)
+            return
+
+        with self.metrics.time_stage("table"):
+            self.update_result_table(predictions)
+        with self.metrics.time_stage("plot"):
+            self.plot_window.update_plot(predictions)
+
+    def update_overlay(self, text: str):
+        self.overlay_label.config(text=text)
+        self.last_overlay_update = time.perf_counter()
 
     def update_result_table(self, predictions):
-        for item in self.result_table.get_children():
-            self.result_table.delete(item)
+        """Schedules a table refresh, at most table_max_fps times per second with the newest predictions."""
+        self.pending_table_predictions = predictions
+        if self.table_refresh_job is not None:
+            return
 
-        sorted_predictions = sorted(predictions.items(), key=lambda x: x[1], reverse=True)
+        delay = self.table_min_interval - (time.perf_counter() - self.last_table_refresh)
+        if delay > 0:
+            self.table_refresh_job = self.root.after(int(delay * 1000), self.refresh_result_table)
+        else:
+            self.refresh_result_table()
 
-        for rank, (sign, prob) in enumerate(sorted_predictions, start=1):
-            self.result_table.insert("", tk.END, values=(rank, sign, f"{prob * 100:.2f}"))
+    def refresh_result_table(self):
+        self.table_refresh_job = None
+        predictions, self.pending_table_predictions = self.pending_table_predictions, None
+        if predictions is None:
+            return
+        self.last_table_refresh = time.perf_counter()
+
+        sorted_signs = sorted(predictions, key=predictions.get, reverse=True)
+        visible_signs = sorted_signs[:self.table_top_n] if self.table_top_n else sorted_signs
+
+        # Only rows whose displayed values changed are touched
+        for rank, sign in enumerate(visible_signs, start=1):
+            values = (rank, sign, f"{predictions[sign] * 100:.2f}")
+            if self.table_values.get(sign) != values:
+                if not self.result_table.exists(sign):
+                    self.result_table.insert("", tk.END, iid=sign, values=values)
+                else:
+                    self.result_table.item(sign, values=values)
+                self.table_values[sign] = values
+
+        # Rows are moved only when the ranking changes, rows outside the top N are detached
+        if visible_signs != self.table_order:
+            for sign in set(self.table_order) - set(visible_signs):
+                if self.result_table.exists(sign):
+                    self.result_table.detach(sign)
+            for index, sign in enumerate(visible_signs):
+                self.result_table.move(sign, '', index)
+            self.table_order = visible_signs
 
     def on_closing(self):
         if self.plot_window:
@@ -0,0 +1,361 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent landmark requests into one classifier call. A batch is closed when it
+    holds max_batch_size hands or when its first request waited max_wait seconds, whichever
+    comes first. Batches run one at a time on a single model thread.
+    """
+
+    def __init__(self, predict_batch: Callable, executor: ThreadPoolExecutor, metrics: Metrics,
+                 max_batch_size: int = 32, max_wait: float = 0.005):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.batched_hands = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.batched_hands / self.batches if self.batches else 0.0
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, landmarks: np.ndarray, is_right: Optional[np.ndarray] = None) -> np.ndarray:
+        """Queues (N, 21, 3) landmarks and returns their (N, num_classes) probabilities once their batch ran."""
+        if is_right is None:
+            is_right = np.zeros(len(landmarks), dtype=bool)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((landmarks, is_right, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self.queue.get()]
+            size = len(requests[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            await self.run_batch(requests, size)
+
+    async def run_batch(self, requests: list, size: int):
+        landmarks = np.concatenate([request[0] for request in requests])
+        is_right = np.concatenate([request[1] for request in requests])
+
+        start = time.perf_counter()
+        try:
+            probabilities, _ = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.predict_batch, landmarks, is_right
+            )
+        except Exception as error:
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.metrics.observe("batch_forward", (time.perf_counter() - start) * 1000)
+
+        self.batches += 1
+        self.batched_hands += size
+        offset = 0
+        for request_landmarks, _, future in requests:
+            count = len(request_landmarks)
+            if not future.done():
+                future.set_result(probabilities[offset:offset + count])
+            offset += count
+
+
+class InferenceServer:
+    """
+    Local HTTP/1.1 server sharing one SignPredictor between thin clients.
+
+    POST /predict        JSON {"landmarks": [[x, y, z] * 21] per hand, "handedness": ["Left" | "Right", ...],
+                         "top_k": 3}. Requests from all clients are micro-batched.
+    POST /predict/frame  JPEG or PNG body, hands are detected with MediaPipe and their landmarks go through
+                         the same batcher. top_k is given as a query parameter.
+    GET  /stats          Metrics snapshot with request latency and batching statistics as JSON.
+    GET  /metrics        The same metrics in Prometheus text format.
+    """
+
+    def __init__(self, predictor_options: Optional[dict] = None, host: str = '127.0.0.1', port: int = 8765,
+                 max_batch_size: int = 32, max_wait: float = 0.005):
+        from sign_predictor import SignPredictor
+
+        self.host, self.port = host, port
+        self.metrics = Metrics()
+        # Frames come from unrelated clients, so hands are detected in every image instead of tracked
+        options = dict(predictor_options or {}, static_image_mode=True, roi_padding=None)
+        self.predictor = SignPredictor(metrics=self.metrics, **options)
+        self.predictor.annotate_frames = False
+        self.labels = [self.predictor.signs_dict[index] for index in range(len(self.predictor.signs_dict))]
+
+        # The classifier and MediaPipe are each used from one thread only
+        self.model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+        self.detection_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mediapipe")
+        self.batcher = MicroBatcher(self.predictor.predict_batch, self.model_executor, self.metrics,
+                                    max_batch_size, max_wait)
+        self.metrics.register_gauge("batches", lambda: self.batcher.batches, kind='counter')
+        self.metrics.register_gauge("batched_hands", lambda: self.batcher.batched_hands, kind='counter')
+        self.metrics.register_gauge("mean_batch_size", lambda: round(self.batcher.mean_batch_size, 3))
+        self.server = None
+
+    async def start(self):
+        self.batcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Serving on http://{self.host}:{self.port} (max batch {self.batcher.max_batch_size}, "
+                    f"max wait {self.batcher.max_wait * 1000:.1f} ms).")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.batcher.stop()
+        self.model_executor.shutdown(wait=False)
+        self.detection_executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+
+                start = time.perf_counter()
+                try:
+                    status, content_type, payload = await self.dispatch(method, target, headers, body)
+                except HttpError as error:
+                    status, content_type, payload = error.status, "application/json", {"error": str(error)}
+                except Exception as error:
+                    logger.exception("Request failed.")
+                    status, content_type, payload = 500, "application/json", {"error": str(error)}
+                self.metrics.increment(f"responses_{status}")
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, content_type, payload, keep_alive)
+                await writer.drain()
+                self.metrics.observe(f"request {urlsplit(target).path}", (time.perf_counter() - start) * 1000)
+                if not keep_alive:
+                    break
+        except HttpError as error:
+            write_response(writer, error.status, "application/json", {"error": str(error)}, keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        url = urlsplit(target)
+        routes = {
+            "/predict": ("POST", self.predict_landmarks),
+            "/predict/frame": ("POST", self.predict_frame),
+            "/stats": ("GET", self.stats),
+            "/metrics": ("GET", self.prometheus_metrics),
+        }
+        if url.path not in routes:
+            raise HttpError(404, f"Unknown path {url.path}.")
+        route_method, handler = routes[url.path]
+        if method != route_method:
+            raise HttpError(405, f"{url.path} expects {route_method}.")
+        return await handler(parse_qs(url.query), body)
+
+    async def predict_landmarks(self, query: dict, body: bytes):
+        try:
+            request = json.loads(body)
+            landmarks = np.asarray(request["landmarks"], dtype=np.float32)
+        except (ValueError, KeyError, TypeError) as error:
+            raise HttpError(400, f"Expected a JSON object with a landmarks array: {error}")
+        if landmarks.size == 0 or landmarks.size % 63:
+            raise HttpError(400, f"Expected 21 (x, y, z) landmarks per hand, got {landmarks.size} values.")
+        landmarks = landmarks.reshape(-1, 21, 3)
+
+        handedness = request.get("handedness")
+        if handedness is not None:
+            if isinstance(handedness, str):
+                handedness = [handedness]
+            if len(handedness) != len(landmarks):
+                raise HttpError(400, "Expected one handedness label per hand.")
+        is_right = np.array([label == 'Right' for label in handedness], dtype=bool) if handedness is not None else None
+        top_k = parse_top_k(request.get("top_k", 3))
+
+        probabilities = await self.batcher.submit(landmarks, is_right)
+        return 200, "application/json", {"hands": [
+            {"top": self.top_predictions(hand_probabilities, top_k)}
+            for hand_probabilities in probabilities
+        ]}
+
+    async def predict_frame(self, query: dict, body: bytes):
+        import cv2
+
+        top_k = parse_top_k(query.get("top_k", ["3"])[0])
+        frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR) if body else None
+        if frame is None:
+            raise HttpError(400, "Expected a JPEG or PNG image body.")
+
+        with self.metrics.time_stage("detection"):
+            landmarks_list, results = await asyncio.get_running_loop().run_in_executor(
+                self.detection_executor, self.predictor.extract_hand_landmarks, frame
+            )
+        if not landmarks_list:
+            return 200, "application/json", {"hands": []}
+
+        # Right hands are already mirrored by extract_hand_landmarks
+        probabilities = await self.batcher.submit(np.stack(landmarks_list))
+        return 200, "application/json", {"hands": [
+            {
+                "handedness": handedness.classification[0].label,
+                "score": round(handedness.classification[0].score, 4),
+                "top": self.top_predictions(hand_probabilities, top_k),
+            }
+            for handedness, hand_probabilities in zip(results.multi_handedness, probabilities)
+        ]}
+
+    async def stats(self, query: dict, body: bytes):
+        return 200, "application/json", self.metrics.snapshot()
+
+    async def prometheus_metrics(self, query: dict, body: bytes):
+        return 200, "text/plain; version=0.0.4", self.metrics.prometheus_text()
+
+    def top_predictions(self, probabilities: np.ndarray, top_k: int) -> list:
+        indices = np.argsort(-probabilities)[:top_k]
+        return [[self.labels[index], round(float(probabilities[index]), 6)] for index in indices]
+
+
+def parse_top_k(value) -> int:
+    """top_k of a request as a positive integer, given as a JSON number or a query string."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdecimal():
+        raise HttpError(400, f"top_k must be a positive integer, got {value!r}.")
+    return max(1, int(value))
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Reads one HTTP/1.1 request. Returns (method, target, headers, body), or None when the client closed."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line.")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    content_length = headers.get("content-length", "0") or "0"
+    if not content_length.isdecimal():
+        raise HttpError(400, f"Invalid Content-Length {content_length!r}.")
+    length = int(content_length)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Request body larger than {MAX_BODY_BYTES} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, content_type: str, payload, keep_alive: bool):
+    if isinstance(payload, (dict, list)):
+        payload = json.dumps(payload)
+    body = payload.encode('utf-8') if isinstance(payload, str) else payload
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve sign predictions over HTTP with cross-client micro-batching.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--backend', default='torch')
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--inference-width', type=int, default=None)
+    parser.add_argument('--cache-size', type=int, default=None)
+    parser.add_argument('--max-batch-size', type=int, default=32, help="Maximum number of hands per batch.")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="Longest time a request waits for other requests to join its batch.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s", stream=sys.stderr)
+
+    server = InferenceServer(
+        predictor_options={
+            "backend": args.backend,
+            "max_num_hands": args.max_hands,
+            "inference_width": args.inference_width,
+            "cache_capacity": args.cache_size,
+        },
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Stopped by user.")
@@ -1,7 +1,91 @@
+import argparse
+import logging
+import os
+
 from gesture_app import GestureApp
+from models.inference_backends import BACKENDS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sign language recognition app.")
+    parser.add_argument('--camera-index', type=int, default=0)
+    parser.add_argument(
+        '--backend',
+        choices=list(BACKENDS),
+        default=os.environ.get('SIGNDETECT_BACKEND', 'torch'),
+        help="Inference backend (default: $SIGNDETECT_BACKEND or 'torch')."
+    )
+    parser.add_argument('--metrics-dir', default=None, help="Export metrics (JSON and Prometheus text) to this directory.")
+    parser.add_argument('--metrics-interval', type=float, default=5.0, help="Seconds between metric exports.")
+    parser.add_argument('--overlay', action='store_true', help="Show FPS and hand detection rate over the video.")
+    parser.add_argument('--plot-top-k', type=int, default=None, help="Only plot the K most probable signs.")
+    parser.add_argument('--history-length', type=int, default=100, help="Number of frames kept in the plot history.")
+    parser.add_argument('--table-top-n', type=int, default=None, help="Only show the N most probable signs in the table.")
+    parser.add_argument('--table-max-fps', type=float, default=None, help="Maximum result table refreshes per second.")
+    parser.add_argument('--display-max-fps', type=float, default=None, help="Maximum video refreshes per second.")
+    parser.add_argument('--capture-fps', type=float, default=None, help="Target camera capture rate.")
+    parser.add_argument('--inference-fps', type=float, default=None, help="Target inference rate.")
+    parser.add_argument('--inference-width', type=int, default=None,
+                        help="Downscale frames wider than this before hand detection.")
+    parser.add_argument('--roi-padding', type=float, default=None,
+                        help="Crop hand detection to the previous hand box padded by this fraction (e.g. 0.3).")
+    parser.add_argument('--motion-threshold', type=float, default=None,
+                        help="Skip inference on frames whose mean thumbnail change is below this value (0-255).")
+    parser.add_argument('--motion-refresh', type=float, default=1.0,
+                        help="Seconds after which a static frame is processed anyway.")
+    parser.add_argument('--cache-size', type=int, default=None,
+                        help="Cache up to this many predictions keyed by quantized landmarks.")
+    parser.add_argument('--cache-step', type=float, default=0.01,
+                        help="Quantization step of the prediction cache keys (normalized units).")
+    parser.add_argument('--max-hands', type=int, default=1, help="Maximum number of hands detected per frame.")
+    parser.add_argument('--inference-process', action='store_true',
+                        help="Run inference in a separate process fed through a shared-memory frame ring.")
+    parser.add_argument('--ring-slots', type=int, default=4, help="Frame slots of the shared-memory ring (at least 3).")
+    parser.add_argument('--record-db', default=None,
+                        help="Record the landmarks of processed frames into this gesture database.")
+    parser.add_argument('--record-sign', default=None, help="Name of the sign being recorded (required with --record-db).")
+    parser.add_argument('--record-author', default=os.environ.get('USER') or os.environ.get('USERNAME') or 'unknown',
+                        help="Author name stored with the recording.")
+    parser.add_argument('--record-batch-size', type=int, default=64, help="Frames written per database transaction.")
+    parser.add_argument('--consent', action='store_true',
+                        help="The author agrees to the recording being used for training (stored for new authors).")
+    args = parser.parse_args()
+    if args.record_db and not args.record_sign:
+        parser.error("--record-sign is required with --record-db")
+    return args
+
 
 def main():
-    app = GestureApp()
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    app = GestureApp(
+        camera_index=args.camera_index,
+        backend=args.backend,
+        metrics_dir=args.metrics_dir,
+        metrics_interval=args.metrics_interval,
+        show_overlay=args.overlay,
+        plot_top_k=args.plot_top_k,
+        history_length=args.history_length,
+        table_top_n=args.table_top_n,
+        table_max_fps=args.table_max_fps,
+        display_max_fps=args.display_max_fps,
+        target_capture_fps=args.capture_fps,
+        target_inference_fps=args.inference_fps,
+        inference_width=args.inference_width,
+        roi_padding=args.roi_padding,
+        motion_threshold=args.motion_threshold,
+        motion_refresh_interval=args.motion_refresh,
+        cache_capacity=args.cache_size,
+        cache_step=args.cache_step,
+        max_num_hands=args.max_hands,
+        inference_process=args.inference_process,
+        ring_slots=args.ring_slots,
+        record_db=args.record_db,
+        record_sign=args.record_sign,
+        record_author=args.record_author,
+        record_batch_size=args.record_batch_size,
+        record_consent=int(args.consent)
+    )
     try:
         app.run()
     except KeyboardInterrupt:
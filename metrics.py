@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+# Upper bounds of the latency histogram buckets in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for exact percentiles."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS_MS, recent: int = 1000):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def observe(self, value_ms: float):
+        index = next((i for i, bound in enumerate(self.buckets) if value_ms <= bound), len(self.buckets))
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.recent.append(value_ms)
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        recent = np.fromiter(self.recent, dtype=np.float64)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4),
+            "p50_ms": round(float(np.percentile(recent, 50)), 4),
+            "p90_ms": round(float(np.percentile(recent, 90)), 4),
+            "p99_ms": round(float(np.percentile(recent, 99)), 4),
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of the app's hot-path metrics: per-stage latency histograms, counters,
+    and gauges that are read from callables (e.g. FPS counters) when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, tuple[Callable[[], float], str]] = {}
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def observe(self, stage: str, value_ms: float):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].observe(value_ms)
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def register_gauge(self, name: str, read: Callable[[], float], kind: str = 'gauge'):
+        """kind='counter' marks monotonic values that are owned elsewhere, such as queue drop counts."""
+        with self._lock:
+            self.gauges[name] = (read, kind)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = list(self.gauges.items())
+
+        values = {}
+        for name, (read, kind) in gauges:
+            try:
+                values[name] = read()
+            except Exception as error:
+                logging.getLogger(__name__).debug("Gauge %s failed: %s", name, error)
+
+        inferred = counters.get("frames_inferred", 0)
+        return {
+            "timestamp": time.time(),
+            "stages": stages,
+            "counters": counters,
+            "gauges": values,
+            "hand_detection_rate": round(counters.get("hands_detected", 0) / inferred, 4) if inferred else None,
+        }
+
+    def prometheus_text(self, prefix: str = 'signdetect') -> str:
+        with self._lock:
+            histograms = {stage: (list(h.bucket_counts), h.count, h.total_ms) for stage, h in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = list(self.gauges.items())
+
+        lines = [f"# TYPE {prefix}_stage_latency_seconds histogram"]
+        for stage, (bucket_counts, count, total_ms) in histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS_MS + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound / 1000)
+                lines.append(f'{prefix}_stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{stage}"}} {total_ms / 1000}')
+            lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {count}')
+
+        for name, value in counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        for name, (read, kind) in gauges:
+            try:
+                value = read()
+            except Exception:
+                continue
+            metric = f"{prefix}_{name}_total" if kind == 'counter' else f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter(threading.Thread):
+    """Periodically writes the metrics as JSON and as a Prometheus text file (node_exporter textfile format)."""
+
+    def __init__(self, metrics: Metrics, output_dir: str, interval: float = 5.0):
+        super().__init__(name="MetricsExporter", daemon=True)
+        self.metrics = metrics
+        self.output_dir = output_dir
+        self.interval = interval
+        self._stop_event = threading.Event()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.export()
+
+    def export(self):
+        self._write_atomic('signdetect_metrics.json', json.dumps(self.metrics.snapshot(), indent=2))
+        self._write_atomic('signdetect.prom', self.metrics.prometheus_text())
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.interval + 1)
+        self.export()
+
+    def _write_atomic(self, file_name: str, content: str):
+        # Scrapers must never see a half-written file
+        path = os.path.join(self.output_dir, file_name)
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+
+class RateLimitedLogger:
+    """Emits a given message at most once per interval and reports how many repeats were suppressed."""
+
+    def __init__(self, logger: logging.Logger, interval: float = 5.0):
+        self.logger = logger
+        self.interval = interval
+        self._last_emitted: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, message: str, key: Optional[str] = None):
+        key = key or message
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_emitted.get(key, float('-inf')) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            self._last_emitted[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+
+        if suppressed:
+            message = f"{message} ({suppressed} similar messages suppressed)"
+        self.logger.log(level, message)
+
+    def info(self, message: str, key: Optional[str] = None):
+        self.log(logging.INFO, message, key)
+
+    def warning(self, message: str, key: Optional[str] = None):
+        self.log(logging.WARNING, message, key)
@@ -0,0 +1,244 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import numpy as np
+
+# Data of the current worker process, set once by the pool initializer
+_worker_data = {}
+
+
+def build_configs(hidden_sizes: list, learning_rates: list, epochs: list, search: str = 'grid',
+                  trials: int = 10, seed: int = 0) -> list[dict]:
+    """Every combination of the given values, or `trials` distinct random ones."""
+    grid = [
+        {"hidden_sizes": list(sizes), "learning_rate": learning_rate, "epochs": epoch_count}
+        for sizes, learning_rate, epoch_count in itertools.product(hidden_sizes, learning_rates, epochs)
+    ]
+    if search == 'random':
+        return random.Random(seed).sample(grid, min(trials, len(grid)))
+    return grid
+
+
+@contextmanager
+def thread_limits_environment(num_threads: int):
+    """
+    Sets the math libraries' thread variables while workers are started. Spawned workers inherit the
+    environment and import NumPy before their initializer runs, so setting them there is too late.
+    """
+    variables = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+    previous = {variable: os.environ.get(variable) for variable in variables}
+    os.environ.update({variable: str(num_threads) for variable in variables})
+    try:
+        yield
+    finally:
+        for variable, value in previous.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+
+def init_worker(num_threads: int, dataset_dir: str, data: np.ndarray, labels: np.ndarray, num_classes: int):
+    """Pins the worker's PyTorch threads to its share of the cores and opens the dataset once."""
+    import torch
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    if dataset_dir:
+        from models.landmark_dataset import open_landmark_dataset
+
+        landmarks, labels, manifest = open_landmark_dataset(dataset_dir)
+        data, num_classes = landmarks.reshape(-1, 63), manifest["num_classes"]
+    _worker_data.update(data=data, labels=labels, num_classes=num_classes)
+
+
+def run_trial(config: dict, folds: int, fold_index: int, batch_size: int, val_fraction: float, patience: int,
+              seed: int) -> dict:
+    """Trains one fold of one configuration and returns its held-out accuracy and best weights."""
+    import torch
+    import torch.nn as nn
+    from sklearn.model_selection import KFold
+    from models.model_pytorch import SignLanguageModel, create_loader, evaluate, fit_model
+
+    data, labels, num_classes = _worker_data["data"], _worker_data["labels"], _worker_data["num_classes"]
+    splits = KFold(folds, shuffle=True, random_state=seed).split(np.arange(len(data)))
+    train_indices, test_indices = next(itertools.islice(splits, fold_index, None))
+
+    # Early stopping uses a slice of the training folds, the held-out fold is only used for the score
+    train_indices = np.random.default_rng(seed + fold_index).permutation(train_indices)
+    num_val = max(1, int(len(train_indices) * val_fraction))
+    val_indices, train_indices = train_indices[:num_val], train_indices[num_val:]
+
+    torch.manual_seed(seed + fold_index)
+    start = time.perf_counter()
+    model = fit_model(
+        SignLanguageModel(num_classes, config["hidden_sizes"]),
+        create_loader(data, labels, train_indices, batch_size, shuffle=True),
+        create_loader(data, labels, val_indices, batch_size * 4, shuffle=False),
+        config["epochs"], config["learning_rate"], patience, verbose=False
+    )
+    train_time = time.perf_counter() - start
+    _, accuracy = evaluate(model, create_loader(data, labels, test_indices, batch_size * 4, shuffle=False),
+                           nn.CrossEntropyLoss())
+
+    return {
+        "config": config,
+        "fold": fold_index,
+        "accuracy": accuracy,
+        "train_time_s": train_time,
+        "state_dict": {name: tensor.clone() for name, tensor in model.state_dict().items()},
+    }
+
+
+def measure_model_latency(state_dict: dict, num_classes: int, reference: np.ndarray, batch_size: int,
+                          repeats: int) -> dict:
+    """Single-sample and batched p50/p99 latency of a trained model, the way the torch backend runs it."""
+    import torch
+    from models.inference_backends import measure_latency
+    from models.model_pytorch import SignLanguageModel
+
+    model = torch.nn.Sequential(SignLanguageModel.from_state_dict(state_dict, num_classes), torch.nn.Softmax(dim=1))
+    model.eval()
+
+    def predict(inputs):
+        with torch.inference_mode():
+            return model(torch.from_numpy(inputs)).numpy()
+
+    batch = np.ascontiguousarray(np.resize(reference, (batch_size, 63)))
+    return {
+        "single": measure_latency(predict, reference[:1], repeats),
+        f"batch_{batch_size}": measure_latency(predict, batch, repeats),
+    }
+
+
+def run_sweep(configs: list[dict], folds: int = 5, workers: int = None, dataset_dir: str = None,
+              data: np.ndarray = None, labels: np.ndarray = None, num_classes: int = None, batch_size: int = 256,
+              val_fraction: float = 0.1, patience: int = 10, latency_threads: int = 1, latency_repeats: int = 200,
+              seed: int = 42) -> list[dict]:
+    """
+    Runs every (configuration, fold) trial on a pool of worker processes, each pinned to
+    cores // workers threads. Latency is measured afterwards, one model at a time, so it is not
+    skewed by trials still training.
+    """
+    import torch
+
+    cores = os.cpu_count() or 1
+    workers = workers or max(1, min(cores, len(configs) * folds))
+    threads_per_worker = max(1, cores // workers)
+    print(f"[INFO] {len(configs)} configurations x {folds} folds on {workers} workers "
+          f"with {threads_per_worker} thread(s) each.")
+
+    # Workers open an exported dataset themselves, otherwise the arrays are sent to each of them once
+    initargs = (threads_per_worker, dataset_dir, None if dataset_dir else data,
+                None if dataset_dir else labels, num_classes)
+    results = {index: [] for index in range(len(configs))}
+    start = time.perf_counter()
+    # Workers are started on demand while trials are submitted, so the variables stay set for the whole pool
+    with thread_limits_environment(threads_per_worker), \
+            ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn'), initializer=init_worker,
+                                initargs=initargs) as executor:
+        futures = {
+            executor.submit(run_trial, config, folds, fold_index, batch_size, val_fraction, patience, seed): index
+            for index, config in enumerate(configs) for fold_index in range(folds)
+        }
+        for future in as_completed(futures):
+            trial = future.result()
+            results[futures[future]].append(trial)
+            print(f"[INFO] {trial['config']} fold {trial['fold'] + 1}/{folds}: "
+                  f"{trial['accuracy'] * 100:.2f}% in {trial['train_time_s']:.1f} s")
+    print(f"[INFO] Sweep finished in {time.perf_counter() - start:.1f} s.")
+
+    if dataset_dir:
+        from models.landmark_dataset import open_landmark_dataset
+
+        landmarks, _, manifest = open_landmark_dataset(dataset_dir)
+        reference = np.asarray(landmarks[:1024], dtype=np.float32).reshape(-1, 63)
+        num_classes = manifest["num_classes"]
+    else:
+        reference = np.asarray(data[:1024], dtype=np.float32).reshape(-1, 63)
+
+    torch.set_num_threads(latency_threads)
+    report = []
+    for index, config in enumerate(configs):
+        trials = sorted(results[index], key=lambda trial: trial["fold"])
+        accuracies = np.array([trial["accuracy"] for trial in trials])
+        state_dict = trials[0]["state_dict"]
+        report.append({
+            **config,
+            "parameters": int(sum(tensor.numel() for tensor in state_dict.values())),
+            "accuracy_mean": round(float(accuracies.mean()), 6),
+            "accuracy_std": round(float(accuracies.std()), 6),
+            "fold_accuracies": [round(float(accuracy), 6) for accuracy in accuracies],
+            "train_time_s": round(float(np.mean([trial["train_time_s"] for trial in trials])), 3),
+            "latency_ms": measure_model_latency(state_dict, num_classes, reference, batch_size, latency_repeats),
+        })
+    return report
+
+
+def smallest_within(report: list[dict], tolerance: float) -> dict:
+    """The configuration with the fewest parameters whose mean accuracy is within tolerance of the best."""
+    best_accuracy = max(entry["accuracy_mean"] for entry in report)
+    candidates = [entry for entry in report if entry["accuracy_mean"] >= best_accuracy - tolerance]
+    return min(candidates, key=lambda entry: (entry["parameters"], entry["latency_ms"]["single"]["p50_ms"]))
+
+
+def print_report(report: list[dict], recommended: dict):
+    print(f"\n{'hidden sizes':<16}{'lr':>9}{'epochs':>8}{'params':>9}{'accuracy':>18}{'p50 single':>12}"
+          f"{'p50 batch':>11}")
+    for entry in sorted(report, key=lambda entry: -entry["accuracy_mean"]):
+        batch_latency = next(value for key, value in entry["latency_ms"].items() if key.startswith("batch_"))
+        marker = "  <- smallest within tolerance" if entry is recommended else ""
+        print(f"{'x'.join(map(str, entry['hidden_sizes'])):<16}{entry['learning_rate']:>9g}{entry['epochs']:>8}"
+              f"{entry['parameters']:>9}{entry['accuracy_mean'] * 100:>10.2f}% ± {entry['accuracy_std'] * 100:4.2f}"
+              f"{entry['latency_ms']['single']['p50_ms']:>10.4f}ms{batch_latency['p50_ms']:>9.4f}ms{marker}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep with k-fold cross-validation on a process pool.")
+    parser.add_argument('--db', default='../data/gesture_ai_database.db', help="SQLite database path.")
+    parser.add_argument('--dataset', default=None, help="Dataset exported by models.landmark_dataset.")
+    parser.add_argument('--hidden-sizes', nargs='+', default=['128,64', '64,32', '32', '256,128'],
+                        help="Candidate architectures, hidden layer widths separated by commas.")
+    parser.add_argument('--lr', type=float, nargs='+', default=[0.001, 0.003], help="Candidate learning rates.")
+    parser.add_argument('--epochs', type=int, nargs='+', default=[100], help="Candidate maximum epochs.")
+    parser.add_argument('--search', choices=('grid', 'random'), default='grid')
+    parser.add_argument('--trials', type=int, default=10, help="Number of configurations of a random search.")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--latency-threads', type=int, default=1, help="Threads used to measure inference latency.")
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help="Accuracy loss accepted for a smaller model (0.005 = 0.5 points).")
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    configs = build_configs([[int(size) for size in sizes.split(',')] for sizes in args.hidden_sizes],
+                            args.lr, args.epochs, args.search, args.trials)
+
+    if args.dataset:
+        sweep_report = run_sweep(configs, args.folds, args.workers, dataset_dir=args.dataset,
+                                 batch_size=args.batch_size, patience=args.patience,
+                                 latency_threads=args.latency_threads)
+    else:
+        from models.model_pytorch import load_data_from_db
+
+        data, labels, num_classes = load_data_from_db(args.db)
+        sweep_report = run_sweep(configs, args.folds, args.workers, data=data, labels=labels, num_classes=num_classes,
+                                 batch_size=args.batch_size, patience=args.patience,
+                                 latency_threads=args.latency_threads)
+
+    recommended = smallest_within(sweep_report, args.tolerance)
+    print_report(sweep_report, recommended)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"configurations": sweep_report, "recommended": recommended}, file, indent=2)
+        print(f"\n[INFO] Report written to {args.output}")
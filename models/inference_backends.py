@@ -0,0 +1,233 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from models.numpy_model import NumpySignLanguageModel, file_sha256
+
+
+class InferenceBackend:
+    """
+    Common interface of the sign classifier runtimes. Every backend takes an (N, 63) float32
+    array of landmarks and returns an (N, num_classes) float32 array of probabilities.
+    """
+
+    name = None
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        self.model_path = model_path
+        self.num_classes = num_classes
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def artifact_path(self, suffix: str) -> str:
+        """Path of a compiled artifact cached next to the weights, keyed by the weights' hash."""
+        base = os.path.splitext(self.model_path)[0]
+        return f"{base}.{file_sha256(self.model_path)[:12]}{suffix}"
+
+    def load_probability_model(self):
+        """Eager torch model with the softmax folded in, used as the source for compiled artifacts."""
+        import torch
+        from models.model_pytorch import SignLanguageModel
+
+        state_dict = torch.load(self.model_path, map_location='cpu')
+        sign_model = SignLanguageModel.from_state_dict(state_dict, self.num_classes)
+        return torch.nn.Sequential(sign_model, torch.nn.Softmax(dim=1)).eval()
+
+
+class TorchBackend(InferenceBackend):
+    name = 'torch'
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        super().__init__(model_path, num_classes)
+        import torch
+
+        self.torch = torch
+        self.model = self.load_probability_model()
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        with self.torch.inference_mode():
+            return self.model(self.torch.from_numpy(inputs)).numpy()
+
+
+class TorchScriptBackend(InferenceBackend):
+    name = 'torchscript'
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        super().__init__(model_path, num_classes)
+        import torch
+
+        self.torch = torch
+        script_path = self.artifact_path('.torchscript.pt')
+
+        if not os.path.exists(script_path):
+            print(f"[INFO] Tracing TorchScript model to {script_path}...")
+            example = torch.zeros(1, 63, dtype=torch.float32)
+            with torch.no_grad():
+                traced = torch.jit.freeze(torch.jit.trace(self.load_probability_model(), example))
+            torch.jit.save(traced, script_path)
+
+        self.model = torch.jit.load(script_path, map_location='cpu').eval()
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        with self.torch.inference_mode():
+            return self.model(self.torch.from_numpy(inputs)).numpy()
+
+
+class OnnxBackend(InferenceBackend):
+    name = 'onnx'
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        super().__init__(model_path, num_classes)
+        import onnxruntime as ort
+
+        onnx_path = self.artifact_path('.onnx')
+
+        if not os.path.exists(onnx_path):
+            import torch
+
+            print(f"[INFO] Exporting ONNX model to {onnx_path}...")
+            torch.onnx.export(
+                self.load_probability_model(),
+                torch.zeros(1, 63, dtype=torch.float32),
+                onnx_path,
+                input_names=['landmarks'],
+                output_names=['probabilities'],
+                dynamic_axes={'landmarks': {0: 'batch'}, 'probabilities': {0: 'batch'}},
+                opset_version=17
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: inputs})[0]
+
+
+class QuantizedTorchBackend(InferenceBackend):
+    """Dynamic INT8 quantized variant of the eager model, built once and cached next to the weights."""
+
+    name = 'torch-int8'
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        super().__init__(model_path, num_classes)
+        import torch
+        from models.quantize_model import load_quantized_model, quantize_sign_model
+
+        self.torch = torch
+        quantized_path = self.artifact_path('.int8.pth')
+
+        if not os.path.exists(quantized_path):
+            quantize_sign_model(model_path, quantized_path, num_classes)
+
+        self.model = torch.nn.Sequential(
+            load_quantized_model(quantized_path, num_classes),
+            torch.nn.Softmax(dim=1)
+        ).eval()
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        with self.torch.inference_mode():
+            return self.model(self.torch.from_numpy(inputs)).numpy()
+
+
+class NumpyBackend(InferenceBackend):
+    name = 'numpy'
+
+    def __init__(self, model_path: str = 'models/model_weights.pth', num_classes: int = 29):
+        super().__init__(model_path, num_classes)
+        self.model = NumpySignLanguageModel.from_weights_file(model_path)
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(inputs)
+
+
+BACKENDS = {backend.name: backend for backend in (
+    TorchBackend, TorchScriptBackend, OnnxBackend, QuantizedTorchBackend, NumpyBackend
+)}
+
+
+def create_backend(name: str, model_path: str = 'models/model_weights.pth', num_classes: int = 29) -> InferenceBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', available: {', '.join(BACKENDS)}.")
+    return BACKENDS[name](model_path, num_classes)
+
+
+def reference_landmarks(path: str = None, num_samples: int = 1024, seed: int = 0) -> np.ndarray:
+    """
+    Reference input set for backend comparisons: recorded landmarks from a .npy file when given
+    (e.g. landmarks.npy of an exported landmark dataset, of which the first num_samples are used),
+    otherwise a deterministic synthetic set of hand-like (N, 63) samples.
+    """
+    if path:
+        landmarks = np.load(path, mmap_mode='r')
+        return np.asarray(landmarks.reshape(len(landmarks), -1)[:num_samples], dtype=np.float32).reshape(-1, 63)
+
+    rng = np.random.default_rng(seed)
+    wrist = rng.uniform(0.3, 0.7, size=(num_samples, 1, 3)) * np.array([1.0, 1.0, 0.0])
+    offsets = rng.normal(0.0, 0.08, size=(num_samples, 21, 3)) * np.array([1.0, 1.0, 0.3])
+    offsets[:, 0] = 0.0
+    return (wrist + offsets).astype(np.float32).reshape(num_samples, 63)
+
+
+def measure_latency(predict, inputs: np.ndarray, repeats: int = 200, warmup: int = 10) -> dict:
+    """Calls predict(inputs) repeatedly and returns p50/p99 latency in milliseconds."""
+    for _ in range(warmup):
+        predict(inputs)
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(inputs)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def compare_backends(names: list[str], reference: np.ndarray, model_path: str = 'models/model_weights.pth',
+                     repeats: int = 200) -> dict:
+    """Checks that all backends agree on the top-1 class and measures their single-sample latency."""
+    report = {}
+    baseline = None
+
+    for name in names:
+        try:
+            backend = create_backend(name, model_path)
+        except ImportError as error:
+            report[name] = {"available": False, "error": str(error)}
+            continue
+
+        top1 = backend.predict_proba(reference).argmax(axis=1)
+        baseline = top1 if baseline is None else baseline
+
+        report[name] = {
+            "available": True,
+            "top1_matches": bool(np.array_equal(top1, baseline)),
+            "mismatches": int((top1 != baseline).sum()),
+            **measure_latency(backend.predict_proba, reference[:1], repeats),
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare inference backends on a reference landmark set.")
+    # The quantized backend is approximate by design, its agreement is reported by models.quantize_model
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS),
+                        default=[name for name in BACKENDS if name != QuantizedTorchBackend.name])
+    parser.add_argument('--model-path', default='models/model_weights.pth')
+    parser.add_argument('--reference', default=None, help="Optional .npy file with (N, 21, 3) landmarks.")
+    args = parser.parse_args()
+
+    results = compare_backends(args.backends, reference_landmarks(args.reference), args.model_path)
+    for backend_name, result in results.items():
+        print(f"{backend_name}: {result}")
+
+    if not all(result["top1_matches"] for result in results.values() if result["available"]):
+        raise SystemExit("[ERROR] Backends disagree on top-1 predictions.")
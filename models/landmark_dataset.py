@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import Float, cast, create_engine, func, inspect, select
+
+from models.models import Sign, Video, Frame, FrameCoordinate
+
+DATASET_VERSION = 1
+LANDMARKS_FILE = 'landmarks.npy'
+LABELS_FILE = 'labels.npy'
+MANIFEST_FILE = 'manifest.json'
+# Compact per-frame storage: 21 keypoints x (x, y, z) as little-endian float32
+LANDMARKS_BLOB_DTYPE = '<f4'
+LANDMARKS_BLOB_SIZE = 63 * 4
+# frame_count of a video whose session is still being recorded (session_recorder), readers skip such videos
+RECORDING_FRAME_COUNT = -1
+
+
+def pack_landmarks(landmarks) -> bytes:
+    """Packs one frame's (21, 3) landmarks as the 252-byte little-endian float32 blob stored in frames.landmarks."""
+    return np.asarray(landmarks, dtype=LANDMARKS_BLOB_DTYPE).reshape(63).tobytes()
+
+
+def unpack_landmarks(blobs) -> np.ndarray:
+    """Unpacks a sequence of frames.landmarks blobs into an (N, 21, 3) float32 array with one buffer copy."""
+    return np.frombuffer(b''.join(blobs), dtype=LANDMARKS_BLOB_DTYPE).reshape(-1, 21, 3).astype(np.float32)
+
+
+def has_landmark_blobs(connection) -> bool:
+    """Whether the database was migrated to the compact per-frame storage (models.migrate_landmarks)."""
+    return any(column['name'] == 'landmarks' for column in inspect(connection).get_columns('frames'))
+
+
+@contextmanager
+def read_snapshot(connection):
+    """
+    Runs the enclosed queries in one SQLite read transaction, so they all see the database as of
+    the first of them while a session recorder keeps committing frames. pysqlite does not begin a
+    transaction for SELECTs by itself; inside an open transaction this does nothing.
+    """
+    if connection.connection.dbapi_connection.in_transaction:
+        yield connection
+        return
+
+    connection.exec_driver_sql("BEGIN")
+    try:
+        yield connection
+    finally:
+        # Nothing was written, ending the transaction only releases the snapshot
+        connection.exec_driver_sql("ROLLBACK")
+
+
+def read_frame_landmarks(connection, language_id=1, after_video_id=0, up_to_video_id=None, chunk_size=50000):
+    """
+    Reads every frame with all 21 keypoints of the signs in a language, from videos with
+    after_video_id < id <= up_to_video_id. Videos that are still being recorded are skipped.
+
+    Frames that have a packed landmarks blob are read from it, the others from their
+    frame_coordinates rows. Returns (N, 21, 3) float32 landmarks, the (N,) sign id of every
+    frame, and the number of coordinate rows and frames read.
+    """
+    video_filter = [Sign.languages_id == language_id, Video.id > after_video_id,
+                    Video.frame_count != RECORDING_FRAME_COUNT]
+    if up_to_video_id is not None:
+        video_filter.append(Video.id <= up_to_video_id)
+
+    with read_snapshot(connection):
+        if not has_landmark_blobs(connection):
+            return read_coordinate_landmarks(connection, video_filter, chunk_size)
+
+        blob_data, blob_sign_ids = read_blob_landmarks(connection, video_filter, chunk_size)
+        data, sign_ids, total_rows, frame_count = read_coordinate_landmarks(
+            connection, video_filter + [Frame.landmarks.is_(None)], chunk_size
+        )
+    return (np.concatenate([blob_data, data]), np.concatenate([blob_sign_ids, sign_ids]), total_rows,
+            frame_count + len(blob_data))
+
+
+def read_blob_landmarks(connection, video_filter, chunk_size=50000):
+    """Landmarks and sign ids of the frames stored as packed blobs, one row per frame."""
+    result = connection.execute(
+        select(Frame.landmarks, Video.signs_id)
+        .join(Video, Frame.videos_id == Video.id)
+        .join(Sign, Video.signs_id == Sign.id)
+        .where(*video_filter, Frame.landmarks.is_not(None))
+        .order_by(Frame.id)
+    )
+
+    landmarks, sign_ids = [], []
+    for rows in result.partitions(chunk_size):
+        rows = [row for row in rows if len(row[0]) == LANDMARKS_BLOB_SIZE]
+        if rows:
+            landmarks.append(unpack_landmarks([row[0] for row in rows]))
+            sign_ids.append(np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)))
+
+    if not landmarks:
+        return np.zeros((0, 21, 3), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    return np.concatenate(landmarks), np.concatenate(sign_ids)
+
+
+def read_coordinate_landmarks(connection, video_filter, chunk_size=50000):
+    """
+    Landmarks of the frames stored as one frame_coordinates row per keypoint.
+
+    All coordinates come from a single joined query ordered by frame and point, and are streamed
+    in chunks straight into a preallocated array. Call it inside read_snapshot(), so the frame
+    count and the coordinates come from the same state of the database.
+    """
+    # Upper bound of the sample count, frames with missing keypoints are dropped at the end
+    frame_count = connection.execute(
+        select(func.count(Frame.id)).join(Video, Frame.videos_id == Video.id)
+        .join(Sign, Video.signs_id == Sign.id).where(*video_filter)
+    ).scalar_one()
+
+    data = np.zeros((frame_count, 21, 3), dtype=np.float32)
+    sign_ids = np.zeros(frame_count, dtype=np.int64)
+    points = np.zeros(frame_count, dtype=np.int64)
+
+    # Coordinates are cast in SQL, so no DECIMAL objects are created per value
+    result = connection.execute(
+        select(
+            FrameCoordinate.frame_id, Video.signs_id,
+            cast(FrameCoordinate.x_coordinate, Float), cast(FrameCoordinate.y_coordinate, Float),
+            cast(FrameCoordinate.z_coordinate, Float)
+        )
+        .join(Frame, FrameCoordinate.frame_id == Frame.id)
+        .join(Video, Frame.videos_id == Video.id)
+        .join(Sign, Video.signs_id == Sign.id)
+        .where(*video_filter)
+        .order_by(FrameCoordinate.frame_id, FrameCoordinate.point_number_id)
+    )
+
+    row, last_frame_id, carried, total_rows = -1, None, 0, 0
+    for rows in result.partitions(chunk_size):
+        chunk = np.asarray(rows, dtype=np.float64)
+        frame_ids = chunk[:, 0].astype(np.int64)
+        total_rows += len(chunk)
+
+        # Rows of one frame are consecutive, a new frame starts wherever the id changes
+        new_frame = np.empty(len(chunk), dtype=bool)
+        new_frame[0] = frame_ids[0] != last_frame_id
+        new_frame[1:] = frame_ids[1:] != frame_ids[:-1]
+        sample = row + np.cumsum(new_frame)
+        # Keypoint position within its frame, continuing the count of a frame split across chunks
+        first_row = np.maximum.accumulate(np.where(new_frame, np.arange(len(chunk)), -carried))
+        position = np.arange(len(chunk)) - first_row
+
+        keep = position < 21
+        data[sample[keep], position[keep]] = chunk[keep, 2:5]
+        sign_ids[sample] = chunk[:, 1].astype(np.int64)
+        np.add.at(points, sample, 1)
+
+        row, last_frame_id = int(sample[-1]), int(frame_ids[-1])
+        carried = int(position[-1]) + 1
+
+    complete = points == 21
+    return data[complete], sign_ids[complete], total_rows, frame_count
+
+
+def read_signs(connection, language_id=1):
+    """(id, name) of the signs in a language, ordered by id. A sign's position is its class label."""
+    return connection.execute(
+        select(Sign.id, Sign.name).where(Sign.languages_id == language_id).order_by(Sign.id)
+    ).all()
+
+
+def labels_from_sign_ids(sign_ids, sign_id_mapping):
+    """Maps sign ids to compact labels with one lookup table instead of a dict access per sample."""
+    label_lookup = np.full(max(sign_id_mapping, default=0) + 1, -1, dtype=np.int64)
+    label_lookup[list(sign_id_mapping)] = list(sign_id_mapping.values())
+    return label_lookup[sign_ids]
+
+
+def read_manifest(dataset_dir):
+    manifest_path = os.path.join(dataset_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as file:
+        return json.load(file)
+
+
+def open_landmark_dataset(dataset_dir):
+    """
+    Opens an exported dataset without reading it: returns read-only memory-mapped (N, 21, 3) float32
+    landmarks and (N,) int64 labels, plus the manifest.
+    """
+    manifest = read_manifest(dataset_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"[Error] No landmark dataset found in {dataset_dir}.")
+    if manifest["version"] != DATASET_VERSION:
+        raise ValueError(f"[Error] Unsupported landmark dataset version {manifest['version']}.")
+
+    # Rows past the manifest's count belong to an export that did not finish
+    count = manifest["count"]
+    landmarks = np.load(os.path.join(dataset_dir, LANDMARKS_FILE), mmap_mode='r')[:count]
+    labels = np.load(os.path.join(dataset_dir, LABELS_FILE), mmap_mode='r')[:count]
+    return landmarks, labels, manifest
+
+
+def append_array(path, count, rows):
+    """
+    Writes the first `count` rows of the .npy file at path followed by `rows` to a new file, which
+    then replaces it. The existing rows are copied through memory maps, never loaded at once.
+    """
+    existing = np.load(path, mmap_mode='r') if count else None
+    temporary_path = path + '.tmp'
+    output = np.lib.format.open_memmap(
+        temporary_path, mode='w+', dtype=rows.dtype, shape=(count + len(rows),) + rows.shape[1:]
+    )
+    if count:
+        output[:count] = existing[:count]
+    output[count:] = rows
+    output.flush()
+    # Mappings must be released before the file can be replaced
+    del output, existing
+    os.replace(temporary_path, path)
+
+
+def export_landmark_dataset(db_path, dataset_dir, language_id=1, chunk_size=50000):
+    """
+    Exports the frames of a language from the database to dataset_dir, or appends the frames of
+    videos added since the last export (tracked by the highest exported Video.id). A video that is
+    still being recorded holds back itself and every later video until its session is finished.
+    Labels of already exported signs never change, new signs get the next free labels.
+    """
+    start = time.perf_counter()
+    os.makedirs(dataset_dir, exist_ok=True)
+
+    manifest = read_manifest(dataset_dir)
+    if manifest is not None and (manifest["version"] != DATASET_VERSION or manifest["language_id"] != language_id):
+        raise ValueError(f"[Error] {dataset_dir} holds a different dataset, export to an empty directory.")
+
+    after_video_id = manifest["max_video_id"] if manifest else 0
+    count = manifest["count"] if manifest else 0
+
+    engine = create_engine(f'sqlite:///{db_path}')
+    # Videos committed while the export runs are left for the next one
+    with engine.connect() as connection, read_snapshot(connection):
+        signs = read_signs(connection, language_id)
+        up_to_video_id = connection.execute(
+            select(func.max(Video.id)).join(Sign, Video.signs_id == Sign.id).where(Sign.languages_id == language_id)
+        ).scalar() or 0
+        recording_video_id = connection.execute(
+            select(func.min(Video.id)).join(Sign, Video.signs_id == Sign.id)
+            .where(Sign.languages_id == language_id, Video.id > after_video_id,
+                   Video.frame_count == RECORDING_FRAME_COUNT)
+        ).scalar()
+        if recording_video_id is not None:
+            # Exported video ids must stay contiguous, or the rest of that session would never be exported
+            up_to_video_id = recording_video_id - 1
+            print(f"[WARNING] Video {recording_video_id} is still being recorded, exporting videos up to "
+                  f"{up_to_video_id}. A session that was interrupted stays marked as recording "
+                  f"(frame_count {RECORDING_FRAME_COUNT}) until it is finished or deleted.")
+        if up_to_video_id <= after_video_id:
+            print(f"[INFO] Landmark dataset is up to date ({count} samples, last video {after_video_id}).")
+            return manifest
+
+        landmarks, sign_ids, total_rows, frame_count = read_frame_landmarks(
+            connection, language_id, after_video_id, up_to_video_id, chunk_size
+        )
+
+    exported_signs = manifest["signs"] if manifest else []
+    sign_id_mapping = {sign["id"]: sign["label"] for sign in exported_signs}
+    for sign_id, name in signs:
+        if sign_id not in sign_id_mapping:
+            sign_id_mapping[sign_id] = len(sign_id_mapping)
+            exported_signs.append({"id": sign_id, "label": sign_id_mapping[sign_id], "name": name})
+    labels = labels_from_sign_ids(sign_ids, sign_id_mapping)
+
+    append_array(os.path.join(dataset_dir, LANDMARKS_FILE), count, landmarks)
+    append_array(os.path.join(dataset_dir, LABELS_FILE), count, labels)
+
+    # The manifest is written last, so an interrupted export leaves the previous one usable
+    manifest = {
+        "version": DATASET_VERSION,
+        "language_id": language_id,
+        "count": count + len(landmarks),
+        "max_video_id": int(up_to_video_id),
+        "num_classes": len(sign_id_mapping),
+        "signs": exported_signs,
+        "landmarks_shape": [count + len(landmarks), 21, 3],
+        "source": os.path.abspath(db_path),
+        "updated": datetime.now(timezone.utc).isoformat(),
+    }
+    temporary_path = os.path.join(dataset_dir, MANIFEST_FILE + '.tmp')
+    with open(temporary_path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temporary_path, os.path.join(dataset_dir, MANIFEST_FILE))
+
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Appended {len(landmarks)} samples ({frame_count - len(landmarks)} incomplete frames skipped, "
+          f"{total_rows} coordinates) of videos {after_video_id + 1}-{up_to_video_id} in {elapsed:.2f} s, "
+          f"{manifest['count']} samples in total.")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export landmarks from the database to a memory-mappable dataset, or append new videos to it."
+    )
+    parser.add_argument('--db', default='../data/gesture_ai_database.db', help="SQLite database path.")
+    parser.add_argument('--output', default='../data/landmark_dataset', help="Dataset directory.")
+    parser.add_argument('--language-id', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Coordinate rows fetched per chunk.")
+    args = parser.parse_args()
+
+    export_landmark_dataset(args.db, args.output, args.language_id, args.chunk_size)
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from models.landmark_dataset import pack_landmarks, read_frame_landmarks
+
+# Foreign keys that are not the leading column of a primary key or unique constraint, named like SQLAlchemy's index=True
+FOREIGN_KEY_INDEXES = (
+    ("frames", "videos_id"),
+    ("videos", "signs_id"),
+    ("videos", "author_id"),
+    ("signs", "languages_id"),
+    ("frame_coordinates", "point_number_id"),
+    ("body_parts_per_signs", "body_parts_id"),
+    ("body_parts_per_videos", "body_parts_id"),
+)
+
+
+def database_size(db_path: str) -> int:
+    """Size of the database file including a pending write-ahead log."""
+    wal_path = db_path + '-wal'
+    return os.path.getsize(db_path) + (os.path.getsize(wal_path) if os.path.exists(wal_path) else 0)
+
+
+def benchmark_load(db_path: str, language_id: int = 1, repeats: int = 3) -> dict:
+    """Best-of-N time of loading all complete frames of a language the way training does."""
+    engine = create_engine(f'sqlite:///{db_path}')
+    timings, frames = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            landmarks, _, _, _ = read_frame_landmarks(connection, language_id)
+        timings.append(time.perf_counter() - start)
+        frames = len(landmarks)
+    engine.dispose()
+
+    best = min(timings)
+    return {"frames": frames, "load_s": round(best, 4), "frames_per_s": round(frames / best, 1) if best else None}
+
+
+def create_indexes(connection: sqlite3.Connection) -> list[str]:
+    existing_tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    created = []
+    for table, column in FOREIGN_KEY_INDEXES:
+        if table in existing_tables:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})")
+            created.append(f"ix_{table}_{column}")
+    return created
+
+
+def pack_frames(connection: sqlite3.Connection, batch_size: int = 10000, drop_coordinates: bool = False) -> dict:
+    """
+    Fills frames.landmarks for every frame that has all 21 keypoints and no blob yet, one
+    transaction per batch of frames, so an interrupted migration resumes where it stopped.
+    """
+    packed, incomplete, last_id = 0, 0, 0
+    while True:
+        frame_ids = [row[0] for row in connection.execute(
+            "SELECT id FROM frames WHERE landmarks IS NULL AND id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+        )]
+        if not frame_ids:
+            break
+        last_id = frame_ids[-1]
+
+        rows = connection.execute(
+            "SELECT frame_id, x_coordinate, y_coordinate, z_coordinate FROM frame_coordinates "
+            "WHERE frame_id BETWEEN ? AND ? ORDER BY frame_id, point_number_id", (frame_ids[0], frame_ids[-1])
+        ).fetchall()
+        if not rows:
+            incomplete += len(frame_ids)
+            continue
+
+        # Rows of a frame are consecutive, frames with exactly 21 of them are packed
+        values = np.asarray(rows, dtype=np.float64)
+        ids, starts, counts = np.unique(values[:, 0].astype(np.int64), return_index=True, return_counts=True)
+        # Frames in the id range that were packed earlier keep their blob
+        complete = (counts == 21) & np.isin(ids, frame_ids)
+        landmarks = values[starts[complete][:, None] + np.arange(21), 1:4]
+        complete_ids = ids[complete].tolist()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "UPDATE frames SET landmarks = ? WHERE id = ?",
+                [(pack_landmarks(frame), frame_id) for frame, frame_id in zip(landmarks, complete_ids)]
+            )
+            if drop_coordinates:
+                connection.executemany("DELETE FROM frame_coordinates WHERE frame_id = ?",
+                                       [(frame_id,) for frame_id in complete_ids])
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+        packed += len(complete_ids)
+        incomplete += len(frame_ids) - len(complete_ids)
+        print(f"[INFO] Packed {packed} frames (up to frame {last_id}).")
+
+    return {"packed_frames": packed, "skipped_incomplete_frames": incomplete}
+
+
+def migrate_database(db_path: str, language_id: int = 1, batch_size: int = 10000, drop_coordinates: bool = False,
+                     vacuum: bool = False, backup: bool = True, benchmark: bool = True) -> dict:
+    """
+    Adds the packed landmarks column and the foreign key indexes to a gesture database, fills the
+    column from frame_coordinates and reports size and training load time before and after.
+    """
+    report = {"database": os.path.abspath(db_path)}
+
+    if backup:
+        backup_path = db_path + '.bak'
+        source, destination = sqlite3.connect(db_path), sqlite3.connect(backup_path)
+        try:
+            source.backup(destination)
+        finally:
+            source.close()
+            destination.close()
+        report["backup"] = os.path.abspath(backup_path)
+        print(f"[INFO] Backup written to {backup_path}")
+
+    report["before"] = {"size_bytes": database_size(db_path)}
+    if benchmark:
+        report["before"].update(benchmark_load(db_path, language_id))
+
+    # Autocommit mode, the batches open their own transactions
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(frames)")}
+        if 'landmarks' not in columns:
+            connection.execute("ALTER TABLE frames ADD COLUMN landmarks BLOB")
+
+        start = time.perf_counter()
+        report["indexes"] = create_indexes(connection)
+        report.update(pack_frames(connection, batch_size, drop_coordinates))
+        connection.execute("ANALYZE")
+        if vacuum:
+            print("[INFO] Compacting the database file...")
+            connection.execute("VACUUM")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        report["migration_s"] = round(time.perf_counter() - start, 3)
+    finally:
+        connection.close()
+
+    report["after"] = {"size_bytes": database_size(db_path)}
+    if benchmark:
+        report["after"].update(benchmark_load(db_path, language_id))
+        if report["after"]["load_s"]:
+            report["load_speedup"] = round(report["before"]["load_s"] / report["after"]["load_s"], 2)
+    report["size_ratio"] = round(report["after"]["size_bytes"] / report["before"]["size_bytes"], 4)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Store landmarks as one packed float32 blob per frame and add the missing foreign key indexes."
+    )
+    parser.add_argument('--db', default='../data/gesture_ai_database.db', help="SQLite database path.")
+    parser.add_argument('--language-id', type=int, default=1, help="Language used for the load time benchmark.")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Frames packed per transaction.")
+    parser.add_argument('--drop-coordinates', action='store_true',
+                        help="Delete the frame_coordinates rows of packed frames (with --vacuum, shrinks the file).")
+    parser.add_argument('--vacuum', action='store_true', help="Rebuild the database file afterwards.")
+    parser.add_argument('--no-backup', action='store_true', help="Do not copy the database to <db>.bak first.")
+    parser.add_argument('--no-benchmark', action='store_true', help="Skip the before/after load time benchmark.")
+    parser.add_argument('--output', default=None, help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    migration_report = migrate_database(
+        args.db, args.language_id, args.batch_size, args.drop_coordinates, args.vacuum,
+        backup=not args.no_backup, benchmark=not args.no_benchmark
+    )
+    output = json.dumps(migration_report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
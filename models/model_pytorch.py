@@ -1,133 +1,315 @@
+import argparse
+import os
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from sklearn.model_selection import train_test_split
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
 import numpy as np
+import time
 
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, inspect
-from models.models import Sign, Base, Video, FrameCoordinate
+from sqlalchemy import create_engine
+from models.landmark_dataset import labels_from_sign_ids, open_landmark_dataset, read_frame_landmarks, read_signs
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_weights.pth')
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_checkpoint.pt')
 
 
 class SignLanguageModel(nn.Module):
-    def __init__(self, num_classes):
+    def __init__(self, num_classes, hidden_sizes=(128, 64)):
         super(SignLanguageModel, self).__init__()
-        self.fc1 = nn.Linear(63, 128)
-        self.fc2 = nn.Linear(128, 64)
-        self.fc3 = nn.Linear(64, num_classes)
+        self.hidden_sizes = tuple(hidden_sizes)
+        sizes = [63, *self.hidden_sizes, num_classes]
+        # Layers are named fc1, fc2, ... so the default architecture keeps its state dict keys.
+        # They are looked up by name in forward(), so quantization can swap them in place.
+        self.layer_names = [f'fc{index}' for index in range(1, len(sizes))]
+        for name, in_features, out_features in zip(self.layer_names, sizes[:-1], sizes[1:]):
+            setattr(self, name, nn.Linear(in_features, out_features))
 
     def forward(self, x):
-        x = torch.relu(self.fc1(x))
-        x = torch.relu(self.fc2(x))
-        x = self.fc3(x)
+        for name in self.layer_names[:-1]:
+            x = torch.relu(getattr(self, name)(x))
+        x = getattr(self, self.layer_names[-1])(x)
         return x
 
+    @classmethod
+    def from_state_dict(cls, state_dict, num_classes):
+        """Builds the model with the hidden sizes the weights were trained with and loads them."""
+        weight_names = sorted((name for name in state_dict if name.endswith('.weight')),
+                              key=lambda name: int(name.split('.')[0][2:]))
+        model = cls(num_classes, [state_dict[name].shape[0] for name in weight_names[:-1]])
+        model.load_state_dict(state_dict)
+        return model
+
 
+def load_data_from_db(db_path, language_id=1, chunk_size=50000):
+    """Loads every frame with all 21 keypoints of the signs in a language as one (N, 63) float32 sample."""
+    start = time.perf_counter()
 
-def load_data_from_db(db_path):
     # Connect to the SQLite database using SQLAlchemy
     engine = create_engine(f'sqlite:///{db_path}')
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    # Display available tables
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    print("Available tables in the database:", tables)
-
-    # Query the database for videos associated with signs in a specific language (language_id = 1)
-    videos = session.query(Video).join(Sign).filter(Sign.languages_id == 1).all()
-
-    data = []
-    labels = []
 
-    # Map original sign IDs to a compact range of labels (0 to num_classes-1)
-    sign_id_mapping = {sign.id: idx for idx, sign in enumerate(session.query(Sign).filter(Sign.languages_id == 1).order_by(Sign.id))}
+    with engine.connect() as connection:
+        # Map original sign IDs to a compact range of labels (0 to num_classes-1)
+        signs = read_signs(connection, language_id)
+        sign_id_mapping = {sign_id: index for index, (sign_id, _) in enumerate(signs)}
+        num_classes = len(sign_id_mapping)
 
-    for video in videos:
-        video_id = video.id
-        sign_id = video.signs_id
-        frame_count = video.frame_count
-        image_width = video.image_width
-        image_height = video.image_height
+        landmarks, sign_ids, total_rows, frame_count = read_frame_landmarks(
+            connection, language_id, chunk_size=chunk_size
+        )
 
-        # Retrieve 3D coordinates from the 21 keypoints
-        frames = session.query(FrameCoordinate).filter(FrameCoordinate.frame_id == video_id).all()
-
-        if len(frames) == 21:
-            frame_data = [coord for frame in frames for coord in (frame.x_coordinate, frame.y_coordinate, frame.z_coordinate)]
-            data.append(frame_data)
-            labels.append(sign_id_mapping[sign_id])
-
-    num_classes  = len(sign_id_mapping)
+    data = landmarks.reshape(-1, 63)
+    labels = labels_from_sign_ids(sign_ids, sign_id_mapping)
+    elapsed = time.perf_counter() - start
 
     print("\n--- Input Data Info ---")
-    print(f"Number of samples: {len(data)}")
-    if data:
+    print(f"Loaded {total_rows} coordinates of {frame_count} frames in {elapsed:.2f} s "
+          f"({total_rows / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+    print(f"Number of samples: {len(data)} ({frame_count - len(data)} frames with missing keypoints skipped)")
+    if len(data):
         print("Sample input:", data[0])
-    print("Input shape:", np.array(data).shape)
+    print("Input shape:", data.shape)
 
     print("\n--- Output Label Info ---")
     print(f"Number of labels: {len(labels)}")
-    if labels:
+    if len(labels):
         print("Sample label:", labels[0])
     print("Number of classes:", num_classes)
-    print("Label values:", set(labels))
+    print("Label values:", set(labels.tolist()))
 
     print("\n--- Sign ID to Name Mapping ---")
-    for actual_id, mapped_id in sign_id_mapping.items():
-        sign_name = session.query(Sign).filter(Sign.id == actual_id).first().name
-        print(f"id: {actual_id}, mapped_id: {mapped_id}, name: {sign_name}")
+    for actual_id, name in signs:
+        print(f"id: {actual_id}, mapped_id: {sign_id_mapping[actual_id]}, name: {name}")
+
+    return data, labels, num_classes
+
+
+class LandmarkDataset(Dataset):
+    """
+    Samples of (N, 63) landmark and (N,) label arrays, which may be memory-mapped. Items are whole
+    batches: the loader passes a list of indices, so every batch is gathered with one array lookup.
 
-    session.close()
-    return np.array(data), np.array(labels), num_classes
+    With dataset_dir set, the arrays are the memory maps of that exported dataset. DataLoader worker
+    processes then receive only the path and open their own memory maps on first use.
+    """
 
+    def __init__(self, data, labels, indices, dataset_dir=None):
+        self.data = data
+        self.labels = labels
+        self.indices = np.asarray(indices)
+        self.dataset_dir = dataset_dir
 
-def train_model(data, labels, num_classes):
-    # Split data into train and test sets
-    X_train, X_test, y_train, y_test = train_test_split(data, labels, test_size=0.5, random_state=42)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.dataset_dir is not None:
+            # A pickled memory map is copied by value, workers started with spawn would get the whole dataset
+            state["data"] = state["labels"] = None
+        return state
 
-    # Convert numpy arrays to PyTorch tensors
-    X_train = torch.tensor(X_train, dtype=torch.float32)
-    X_test = torch.tensor(X_test, dtype=torch.float32)
-    y_train = torch.tensor(y_train, dtype=torch.long)
-    y_test = torch.tensor(y_test, dtype=torch.long)
+    def __len__(self):
+        return len(self.indices)
 
-    # Initialize the model, loss function, and optimizer
-    model = SignLanguageModel(num_classes)
+    def open_arrays(self):
+        landmarks, self.labels, _ = open_landmark_dataset(self.dataset_dir)
+        self.data = landmarks.reshape(-1, 63)
+
+    def __getitem__(self, batch_positions):
+        if self.data is None:
+            self.open_arrays()
+        # Sorted rows turn the lookup into mostly sequential reads of a memory map
+        rows = np.sort(self.indices[batch_positions])
+        inputs = torch.from_numpy(np.asarray(self.data[rows], dtype=np.float32).reshape(len(rows), 63))
+        targets = torch.from_numpy(np.asarray(self.labels[rows], dtype=np.int64))
+        return inputs, targets
+
+
+def create_loader(data, labels, indices, batch_size, shuffle, num_workers=0, dataset_dir=None):
+    sampler = RandomSampler(range(len(indices))) if shuffle else SequentialSampler(range(len(indices)))
+    return DataLoader(
+        LandmarkDataset(data, labels, indices, dataset_dir),
+        sampler=BatchSampler(sampler, batch_size, drop_last=False),
+        batch_size=None,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0
+    )
+
+
+def split_indices(num_samples, val_fraction, test_fraction, seed=42):
+    """Shuffled train, validation and test index arrays."""
+    indices = np.random.default_rng(seed).permutation(num_samples)
+    num_test = int(num_samples * test_fraction)
+    num_val = int(num_samples * val_fraction)
+    return indices[num_test + num_val:], indices[num_test:num_test + num_val], indices[:num_test]
+
+
+def evaluate(model, loader, criterion):
+    """Mean loss and accuracy over a loader."""
+    model.eval()
+    total_loss, correct, count = 0.0, 0, 0
+    with torch.no_grad():
+        for inputs, targets in loader:
+            outputs = model(inputs)
+            total_loss += criterion(outputs, targets).item() * len(targets)
+            correct += (outputs.argmax(dim=1) == targets).sum().item()
+            count += len(targets)
+    return (total_loss / count, correct / count) if count else (float('nan'), float('nan'))
+
+
+def fit_model(model, train_loader, val_loader, epochs=200, learning_rate=0.001, patience=10, checkpoint_path=None,
+              checkpoint_every=1, resume=False, run_info=None, verbose=True):
+    """
+    Trains on the train loader's mini-batches and stops once the validation loss did not improve
+    for `patience` epochs. Every `checkpoint_every` epochs the training state is saved, so an
+    interrupted run can resume. Returns the model with the best weights loaded.
+    """
     criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    # Identifies the run a checkpoint belongs to, e.g. the number of classes and the split seed
+    run_info = dict(run_info or {}, hidden_sizes=list(model.hidden_sizes))
+
+    start_epoch, best_val_loss, best_state, epochs_without_improvement = 0, float('inf'), None, 0
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        checkpoint = torch.load(checkpoint_path)
+        if checkpoint["run_info"] != run_info:
+            raise ValueError(f"[Error] Checkpoint {checkpoint_path} belongs to a different training run.")
+        model.load_state_dict(checkpoint["model_state"])
+        optimizer.load_state_dict(checkpoint["optimizer_state"])
+        start_epoch = checkpoint["epoch"]
+        best_val_loss, best_state = checkpoint["best_val_loss"], checkpoint["best_state"]
+        epochs_without_improvement = checkpoint["epochs_without_improvement"]
+        print(f"Resumed from {checkpoint_path} after epoch {start_epoch}")
 
     # Training loop
-    for epoch in range(800):
+    for epoch in range(start_epoch, epochs):
+        if epochs_without_improvement >= patience:
+            break
+
         model.train()
-        optimizer.zero_grad()
-        outputs = model(X_train)
-        loss = criterion(outputs, y_train)
-        loss.backward()
-        optimizer.step()
+        epoch_start = time.perf_counter()
+        train_loss, seen = 0.0, 0
+        for inputs, targets in train_loader:
+            optimizer.zero_grad()
+            loss = criterion(model(inputs), targets)
+            loss.backward()
+            optimizer.step()
+            train_loss += loss.item() * len(targets)
+            seen += len(targets)
+        epoch_time = time.perf_counter() - epoch_start
 
-        if (epoch + 1) % 10 == 0:
-            print(f'Epoch [{epoch+1}/800], Loss: {loss.item():.4f}')
+        val_loss, val_accuracy = evaluate(model, val_loader, criterion)
+        if val_loss < best_val_loss:
+            best_val_loss, epochs_without_improvement = val_loss, 0
+            best_state = {name: tensor.clone() for name, tensor in model.state_dict().items()}
+        else:
+            epochs_without_improvement += 1
 
-    # Evaluate the model on the test set
-    model.eval()
-    with torch.no_grad():
-        outputs = model(X_test)
-        _, predicted = torch.max(outputs.data, 1)
-        accuracy = (predicted == y_test).sum().item() / y_test.size(0)
+        if verbose:
+            print(f'Epoch [{epoch + 1}/{epochs}], Loss: {train_loss / seen:.4f}, Val loss: {val_loss:.4f}, '
+                  f'Val accuracy: {val_accuracy * 100:.2f}%, {epoch_time:.2f} s, {seen / epoch_time:.0f} samples/s')
+
+        if checkpoint_path and ((epoch + 1) % checkpoint_every == 0 or epochs_without_improvement >= patience):
+            save_checkpoint(checkpoint_path, {
+                "epoch": epoch + 1,
+                "model_state": model.state_dict(),
+                "optimizer_state": optimizer.state_dict(),
+                "best_val_loss": best_val_loss,
+                "best_state": best_state,
+                "epochs_without_improvement": epochs_without_improvement,
+                "run_info": run_info,
+            })
+
+    if epochs_without_improvement >= patience and verbose:
+        print(f"Early stopping: validation loss did not improve for {patience} epochs")
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    return model
+
+
+def train_model(data, labels, num_classes, epochs=200, batch_size=256, learning_rate=0.001, val_fraction=0.1,
+                test_fraction=0.2, patience=10, num_workers=0, num_threads=None, weights_path=DEFAULT_WEIGHTS_PATH,
+                checkpoint_path=DEFAULT_CHECKPOINT_PATH, checkpoint_every=1, resume=False, seed=42,
+                hidden_sizes=(128, 64), dataset_dir=None):
+    """
+    Trains with early stopping on a validation split, evaluates the best weights on the test split
+    and saves them to weights_path. dataset_dir names the exported dataset that data and labels were
+    opened from, so loader worker processes can open it themselves.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    torch.manual_seed(seed)
+
+    # Split data into train, validation and test sets, by index so memory-mapped data is not copied
+    train_indices, val_indices, test_indices = split_indices(len(data), val_fraction, test_fraction, seed)
+    if not len(val_indices):
+        raise ValueError("[Error] The validation split is empty, use more data or a larger val_fraction.")
+    print(f"Train: {len(train_indices)}, validation: {len(val_indices)}, test: {len(test_indices)} samples")
+
+    train_loader = create_loader(data, labels, train_indices, batch_size, shuffle=True, num_workers=num_workers,
+                                 dataset_dir=dataset_dir)
+    val_loader = create_loader(data, labels, val_indices, batch_size * 4, shuffle=False)
+    test_loader = create_loader(data, labels, test_indices, batch_size * 4, shuffle=False)
+
+    model = fit_model(
+        SignLanguageModel(num_classes, hidden_sizes), train_loader, val_loader, epochs, learning_rate, patience,
+        checkpoint_path, checkpoint_every, resume,
+        run_info={"num_classes": num_classes, "seed": seed, "samples": len(data)}
+    )
+
+    # Evaluate the best model on the test set
+    if len(test_indices):
+        _, accuracy = evaluate(model, test_loader, nn.CrossEntropyLoss())
         print(f'\nTest Accuracy: {accuracy * 100:.2f}%')
 
     # Save model weights
-    model_save_path = 'model_weights.pth'
-    torch.save(model.state_dict(), model_save_path)
-    print(f"Model weights saved to {model_save_path}")
+    torch.save(model.state_dict(), weights_path)
+    print(f"Model weights saved to {weights_path}")
+    return model
+
+
+def save_checkpoint(path, state):
+    # Written to a temporary file first, so an interruption never leaves a truncated checkpoint
+    temporary_path = path + '.tmp'
+    torch.save(state, temporary_path)
+    os.replace(temporary_path, path)
 
 
 if __name__ == "__main__":
-    db_path = '../data/gesture_ai_database.db'
-    data, labels, num_classes = load_data_from_db(db_path)
+    parser = argparse.ArgumentParser(description="Train the sign classifier.")
+    parser.add_argument('--db', default='../data/gesture_ai_database.db', help="SQLite database path.")
+    parser.add_argument('--dataset', default=None,
+                        help="Train on a dataset exported by models.landmark_dataset instead of the database.")
+    parser.add_argument('--epochs', type=int, default=200, help="Maximum number of epochs.")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--lr', type=float, default=0.001, help="Adam learning rate.")
+    parser.add_argument('--hidden-sizes', type=int, nargs='+', default=[128, 64], help="Hidden layer widths.")
+    parser.add_argument('--val-fraction', type=float, default=0.1, help="Share of samples used for early stopping.")
+    parser.add_argument('--test-fraction', type=float, default=0.2, help="Share of samples used for the final test.")
+    parser.add_argument('--patience', type=int, default=10,
+                        help="Stop after this many epochs without a lower validation loss.")
+    parser.add_argument('--num-workers', type=int, default=0, help="Worker processes (not threads) that gather training batches. With --dataset every "
+                             "worker opens its own memory map of it, 0 gathers batches in the training process.")
+    parser.add_argument('--num-threads', type=int, default=None, help="PyTorch intra-op threads.")
+    parser.add_argument('--weights', default=DEFAULT_WEIGHTS_PATH, help="Where the best weights are saved.")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help="Training checkpoint path.")
+    parser.add_argument('--checkpoint-every', type=int, default=1, help="Epochs between checkpoints.")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint if it exists.")
+    args = parser.parse_args()
+
+    if args.dataset:
+        start = time.perf_counter()
+        landmarks, labels, manifest = open_landmark_dataset(args.dataset)
+        data, num_classes = landmarks.reshape(-1, 63), manifest["num_classes"]
+        print(f"Opened {len(data)} samples from {args.dataset} in {time.perf_counter() - start:.3f} s")
+    else:
+        data, labels, num_classes = load_data_from_db(args.db)
 
     print(f"Min label: {labels.min()}, Max label: {labels.max()}")
 
-    train_model(data, labels, num_classes)
+    train_model(
+        data, labels, num_classes, epochs=args.epochs, batch_size=args.batch_size, learning_rate=args.lr,
+        val_fraction=args.val_fraction, test_fraction=args.test_fraction, patience=args.patience,
+        num_workers=args.num_workers, num_threads=args.num_threads, weights_path=args.weights,
+        checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every, resume=args.resume,
+        hidden_sizes=args.hidden_sizes, dataset_dir=args.dataset
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint, UniqueConstraint, DateTime, DECIMAL
+from sqlalchemy import (Column, Integer, String, ForeignKey, CheckConstraint, UniqueConstraint, DateTime, DECIMAL,
+                        LargeBinary)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 
 Base = declarative_base()
@@ -15,7 +16,7 @@ class Language(Base):
 class Sign(Base):
     __tablename__ = 'signs'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    languages_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
+    languages_id = Column(Integer, ForeignKey('languages.id'), nullable=False, index=True)
     name = Column(String, nullable=False)
     is_dynamic = Column(Integer, nullable=False)
     body_parts_count = Column(Integer, nullable=False)
@@ -40,7 +41,7 @@ class BodyPartsPerSign(Base):
     __tablename__ = 'body_parts_per_signs'
     id = Column(Integer, primary_key=True, autoincrement=True)
     signs_id = Column(Integer, ForeignKey('signs.id'), nullable=False)
-    body_parts_id = Column(Integer, ForeignKey('body_parts.id'), nullable=False)
+    body_parts_id = Column(Integer, ForeignKey('body_parts.id'), nullable=False, index=True)
 
     __table_args__ = (
         UniqueConstraint('signs_id', 'body_parts_id', name='unique_sign_body_part'),
@@ -70,8 +71,9 @@ class Author(Base):
 class Video(Base):
     __tablename__ = 'videos'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    signs_id = Column(Integer, ForeignKey('signs.id'), nullable=False)
-    author_id = Column(Integer, ForeignKey('authors.id'), nullable=False)
+    signs_id = Column(Integer, ForeignKey('signs.id'), nullable=False, index=True)
+    author_id = Column(Integer, ForeignKey('authors.id'), nullable=False, index=True)
+    # RECORDING_FRAME_COUNT (-1) while a recorded session is still being written
     frame_count = Column(Integer, nullable=False)
     creation_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     image_width = Column(Integer)
@@ -89,7 +91,7 @@ class BodyPartsPerVideo(Base):
     __tablename__ = 'body_parts_per_videos'
     id = Column(Integer, primary_key=True, autoincrement=True)
     videos_id = Column(Integer, ForeignKey('videos.id'), nullable=False)
-    body_parts_id = Column(Integer, ForeignKey('body_parts.id'), nullable=False)
+    body_parts_id = Column(Integer, ForeignKey('body_parts.id'), nullable=False, index=True)
 
     __table_args__ = (
         UniqueConstraint('videos_id', 'body_parts_id', name='unique_video_body_part'),
@@ -106,8 +108,12 @@ BodyPart.videos = relationship("BodyPartsPerVideo", order_by=BodyPartsPerVideo.i
 class Frame(Base):
     __tablename__ = 'frames'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    videos_id = Column(Integer, ForeignKey('videos.id'), nullable=False)
+    videos_id = Column(Integer, ForeignKey('videos.id'), nullable=False, index=True)
     frame_number = Column(Integer, nullable=False)
+    # Optional compact copy of the 21 keypoints as 63 packed little-endian float32 values (x, y, z per point).
+    # The column only exists after models.migrate_landmarks: it is deferred, so Frame queries work on older
+    # databases, but reading Frame.landmarks there fails until the database is migrated.
+    landmarks = deferred(Column(LargeBinary))
 
     video = relationship("Video", back_populates="frames")
 
@@ -125,7 +131,7 @@ class PointNumber(Base):
 class FrameCoordinate(Base):
     __tablename__ = 'frame_coordinates'
     frame_id = Column(Integer, ForeignKey('frames.id'), primary_key=True)
-    point_number_id = Column(Integer, ForeignKey('point_numbers.id'), primary_key=True)
+    point_number_id = Column(Integer, ForeignKey('point_numbers.id'), primary_key=True, index=True)
     x_coordinate = Column(DECIMAL(20, 2))
     y_coordinate = Column(DECIMAL(20, 2))
     z_coordinate = Column(DECIMAL(20, 2))
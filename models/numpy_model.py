@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class NumpySignLanguageModel:
+    """
+    Torch-free re-implementation of SignLanguageModel's forward pass.
+    Weights are read from model_weights.pth once (this needs torch) and cached in a .npz file
+    keyed by the hash of the .pth file; afterwards only NumPy is required.
+    """
+
+    def __init__(self, layers: list[tuple[np.ndarray, np.ndarray]]):
+        # Each layer is (weight, bias) with weight stored transposed as (in_features, out_features)
+        self.layers = [(np.ascontiguousarray(weight, dtype=np.float32), np.asarray(bias, dtype=np.float32))
+                       for weight, bias in layers]
+        self.num_classes = self.layers[-1][1].shape[0]
+
+    @classmethod
+    def from_weights_file(cls, model_path: str = 'models/model_weights.pth', cache_path: str = None):
+        cache_path = cache_path or os.path.splitext(model_path)[0] + '.npz'
+        source_hash = file_sha256(model_path) if os.path.exists(model_path) else None
+
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cache:
+                cached_hash = str(cache['source_sha256'])
+                # Without the .pth file (e.g. a torch-free deployment) the cache is trusted as is
+                if source_hash is None or cached_hash == source_hash:
+                    return cls(cls._layers_from_arrays(cache))
+            print(f"[INFO] Weight cache {cache_path} is stale, rebuilding...")
+        elif source_hash is None:
+            raise FileNotFoundError(f"Neither {model_path} nor {cache_path} exists.")
+
+        arrays = cls.convert_state_dict(model_path)
+        np.savez(cache_path, source_sha256=np.array(source_hash), **arrays)
+        print(f"[INFO] Weight cache written to {cache_path}")
+        return cls(cls._layers_from_arrays(arrays))
+
+    @staticmethod
+    def convert_state_dict(model_path: str) -> dict[str, np.ndarray]:
+        import torch
+
+        state_dict = torch.load(model_path, map_location='cpu', weights_only=True)
+        return {name: tensor.detach().cpu().numpy().astype(np.float32) for name, tensor in state_dict.items()}
+
+    @staticmethod
+    def _layers_from_arrays(arrays) -> list[tuple[np.ndarray, np.ndarray]]:
+        layer_names = sorted(
+            {name.rsplit('.', 1)[0] for name in arrays.keys() if name.endswith('.weight')},
+            key=lambda name: int(re.sub(r'\D', '', name) or 0)
+        )
+        return [(arrays[f'{name}.weight'].T, arrays[f'{name}.bias']) for name in layer_names]
+
+    def forward(self, inputs: np.ndarray) -> np.ndarray:
+        outputs = np.asarray(inputs, dtype=np.float32)
+        for index, (weight, bias) in enumerate(self.layers):
+            outputs = outputs @ weight
+            outputs += bias
+            if index < len(self.layers) - 1:
+                np.maximum(outputs, 0, out=outputs)
+        return outputs
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        logits = self.forward(inputs)
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+
+if __name__ == "__main__":
+    # Build the weight cache ahead of time so that deployments can run without torch
+    model = NumpySignLanguageModel.from_weights_file('model_weights.pth')
+    print(f"Cached {len(model.layers)} layers, {model.num_classes} classes.")
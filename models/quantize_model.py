@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from models.model_pytorch import SignLanguageModel
+from models.inference_backends import create_backend, measure_latency, reference_landmarks
+
+
+def _dynamic_quantize(model: nn.Module) -> nn.Module:
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_sign_model(model_path: str, output_path: str, num_classes: int = 29) -> str:
+    """Post-training dynamic quantization: Linear weights become INT8, activations are quantized on the fly."""
+    print(f"[INFO] Quantizing {model_path} to INT8...")
+    model = SignLanguageModel.from_state_dict(torch.load(model_path, map_location='cpu'), num_classes)
+    model.eval()
+
+    # The hidden sizes are stored with the weights, packed INT8 layers do not expose their shapes
+    torch.save({"hidden_sizes": list(model.hidden_sizes), "state_dict": _dynamic_quantize(model).state_dict()},
+               output_path)
+    print(f"[INFO] Quantized weights saved to {output_path}")
+    return output_path
+
+
+def load_quantized_model(quantized_path: str, num_classes: int = 29) -> nn.Module:
+    checkpoint = torch.load(quantized_path, map_location='cpu', weights_only=False)
+    if "state_dict" not in checkpoint:
+        # Artifacts written before the hidden sizes were stored hold a bare state dict of the default model
+        checkpoint = {"hidden_sizes": (128, 64), "state_dict": checkpoint}
+
+    # The quantized state dict can only be loaded into a model that was quantized the same way
+    model = _dynamic_quantize(SignLanguageModel(num_classes, checkpoint["hidden_sizes"]).eval())
+    model.load_state_dict(checkpoint["state_dict"])
+    return model.eval()
+
+
+def quantization_report(model_path: str, reference: np.ndarray, batch_size: int = 256, repeats: int = 200) -> dict:
+    """Compares the INT8 model with the fp32 model: top-1 agreement and single/batched latency."""
+    backends = {name: create_backend(name, model_path) for name in ('torch', 'torch-int8')}
+    top1 = {name: backend.predict_proba(reference).argmax(axis=1) for name, backend in backends.items()}
+
+    batch = np.ascontiguousarray(np.resize(reference, (batch_size, reference.shape[1])))
+    report = {
+        "samples": int(len(reference)),
+        "top1_agreement": round(float((top1['torch'] == top1['torch-int8']).mean()), 6),
+        "fp32_size_bytes": os.path.getsize(model_path),
+        "int8_size_bytes": os.path.getsize(backends['torch-int8'].artifact_path('.int8.pth')),
+    }
+
+    for name, backend in backends.items():
+        report[name] = {
+            "single": measure_latency(backend.predict_proba, reference[:1], repeats),
+            f"batch_{batch_size}": measure_latency(backend.predict_proba, batch, repeats),
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the INT8 model and compare it with the fp32 model.")
+    parser.add_argument('--model-path', default='models/model_weights.pth')
+    parser.add_argument('--reference', default=None, help="Optional .npy file with (N, 21, 3) landmarks.")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--output', default=None, help="Optional path of the JSON report.")
+    args = parser.parse_args()
+
+    results = quantization_report(args.model_path, reference_landmarks(args.reference), args.batch_size)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(results, report_file, indent=2)
@@ -0,0 +1,48 @@
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap change detector in front of the hand detector. Each frame is shrunk to a tiny grayscale
+    thumbnail and compared with the thumbnail of the last processed frame. Frames whose mean absolute
+    difference stays below the threshold are reported as static, except that one frame is let through
+    every refresh_interval seconds.
+    """
+
+    def __init__(self, threshold: float = 3.0, thumbnail_size: tuple = (32, 24), refresh_interval: float = 1.0):
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+        self.refresh_interval = refresh_interval
+        self.reference: Optional[np.ndarray] = None
+        self.last_refresh = 0.0
+        self.checked = 0
+        self.skipped = 0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_process(self, frame: np.ndarray) -> bool:
+        self.checked += 1
+        thumbnail = self.thumbnail(frame)
+        now = time.perf_counter()
+
+        if (self.reference is not None and now - self.last_refresh < self.refresh_interval
+                and cv2.absdiff(thumbnail, self.reference).mean() < self.threshold):
+            self.skipped += 1
+            return False
+
+        # Compared against the last processed frame, so slow drifts add up and eventually pass the gate
+        self.reference, self.last_refresh = thumbnail, now
+        return True
+
+    def reset(self):
+        self.reference = None
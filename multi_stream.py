@@ -0,0 +1,245 @@
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_source(source: str):
+    """Camera indices are given as numbers, anything else is a video file path or stream URL."""
+    return int(source) if source.isdigit() else source
+
+
+def run_stream_worker(stream_id: int, source, options: dict, result_queue: mp.Queue, stop_event,
+                      num_threads: int, stats_interval: float = 5.0):
+    """
+    Capture + SignPredictor loop of one stream, running in its own process. Results go to a bounded
+    queue with put_nowait, so a slow consumer makes this stream drop results instead of blocking it.
+    """
+    # Console output of the predictor must not mix with results written to stdout
+    sys.stdout = sys.stderr
+
+    # Pin the math libraries before they are imported, so workers do not oversubscribe the cores
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[variable] = str(num_threads)
+
+    import cv2
+    from frame_pipeline import FpsCounter
+    from sign_predictor import SignPredictor
+
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    camera = cv2.VideoCapture(source)
+    if not camera.isOpened():
+        result_queue.put({"type": "error", "stream": stream_id, "error": f"Failed to open source {source}."}, timeout=5.0)
+        return
+
+    predictor = SignPredictor(**options)
+    # Only predictions are published, drawing the landmarks onto the frames would be wasted work
+    predictor.annotate_frames = False
+    fps_counter = FpsCounter()
+    frame_number, dropped, last_stats = 0, 0, time.perf_counter()
+
+    def publish(message: dict) -> bool:
+        nonlocal dropped
+        try:
+            result_queue.put_nowait(message)
+            return True
+        except queue.Full:
+            dropped += 1
+            return False
+
+    try:
+        while not stop_event.is_set():
+            ret, frame = camera.read()
+            if not ret:
+                if isinstance(source, str):
+                    # End of a video file
+                    break
+                time.sleep(0.05)
+                continue
+
+            frame_number += 1
+            hands = predictor.process_hands(cv2.flip(frame, 1))
+            fps_counter.tick()
+
+            publish({
+                "type": "result",
+                "stream": stream_id,
+                "frame": frame_number,
+                "timestamp": time.time(),
+                "hands": [
+                    {
+                        "handedness": hand["handedness"],
+                        "score": hand["score"],
+                        "top": sorted(hand["predictions"].items(), key=lambda item: item[1], reverse=True)[:3],
+                    }
+                    for hand in hands
+                ],
+            })
+
+            now = time.perf_counter()
+            if now - last_stats >= stats_interval:
+                last_stats = now
+                snapshot = predictor.metrics.snapshot()
+                publish({
+                    "type": "stats",
+                    "stream": stream_id,
+                    "fps": round(fps_counter.fps, 2),
+                    "frames": frame_number,
+                    "dropped_results": dropped,
+                    "hand_detection_rate": snapshot["hand_detection_rate"],
+                    "stages": snapshot["stages"],
+                })
+    finally:
+        camera.release()
+        try:
+            result_queue.put({"type": "finished", "stream": stream_id, "frames": frame_number,
+                              "dropped_results": dropped}, timeout=5.0)
+        except queue.Full:
+            pass
+
+
+class MultiStreamServer:
+    """
+    Serves several video sources from one box with one capture+inference worker process per stream.
+    Every stream has its own bounded result queue. The aggregator drains the queues round-robin with
+    a per-stream budget, so a busy stream cannot starve the others.
+    """
+
+    def __init__(self, sources: list, predictor_options: Optional[dict] = None, queue_size: int = 8,
+                 max_messages_per_stream: int = 4, stats_interval: float = 5.0):
+        cores = os.cpu_count() or 1
+        if len(sources) > cores:
+            logger.warning(f"{len(sources)} streams on {cores} cores, streams will compete for CPU time.")
+
+        self.sources = sources
+        self.predictor_options = predictor_options or {}
+        self.threads_per_worker = max(1, cores // max(len(sources), 1))
+        self.max_messages_per_stream = max_messages_per_stream
+        self.stats_interval = stats_interval
+
+        context = mp.get_context('spawn')
+        self.stop_event = context.Event()
+        self.queues = [context.Queue(maxsize=queue_size) for _ in sources]
+        self.workers = [
+            context.Process(
+                target=run_stream_worker,
+                args=(stream_id, source, self.predictor_options, self.queues[stream_id], self.stop_event,
+                      self.threads_per_worker, stats_interval),
+                name=f"StreamWorker-{stream_id}",
+                daemon=True
+            )
+            for stream_id, source in enumerate(sources)
+        ]
+        self.stream_stats = {stream_id: {} for stream_id in range(len(sources))}
+
+    def start(self):
+        logger.info(f"Starting {len(self.workers)} stream workers with {self.threads_per_worker} thread(s) each.")
+        for worker in self.workers:
+            worker.start()
+
+    def serve(self, sink: Callable[[dict], None], duration: Optional[float] = None):
+        """Forwards messages from all streams to the sink until every stream finished, or for `duration` seconds."""
+        finished = set()
+        deadline = time.perf_counter() + duration if duration else None
+
+        while len(finished) < len(self.workers):
+            if deadline and time.perf_counter() >= deadline:
+                break
+
+            received = False
+            for stream_id, result_queue in enumerate(self.queues):
+                for _ in range(self.max_messages_per_stream):
+                    try:
+                        message = result_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    received = True
+                    self.handle_message(message, finished)
+                    sink(message)
+
+                if stream_id not in finished and not self.workers[stream_id].is_alive() and result_queue.empty():
+                    finished.add(stream_id)
+
+            if not received:
+                time.sleep(0.005)
+
+    def handle_message(self, message: dict, finished: set):
+        if message["type"] == "stats":
+            self.stream_stats[message["stream"]] = message
+            logger.info(f"Stream {message['stream']}: {message['fps']} fps, "
+                        f"{message['dropped_results']} results dropped, hands {message['hand_detection_rate']}")
+        elif message["type"] in ("finished", "error"):
+            finished.add(message["stream"])
+            if message["type"] == "error":
+                logger.error(message["error"])
+
+    def stop(self):
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+
+
+class JsonLinesSink:
+    """Writes every message as one JSON line, to a file or to stdout."""
+
+    def __init__(self, path: Optional[str] = None, include_stats: bool = True):
+        self.file = open(path, 'w') if path else sys.stdout
+        self.include_stats = include_stats
+
+    def __call__(self, message: dict):
+        if message["type"] == "stats" and not self.include_stats:
+            return
+        self.file.write(json.dumps(message) + "\n")
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve several cameras or videos with one worker process per stream.")
+    parser.add_argument('--source', action='append', required=True,
+                        help="Camera index, video file or stream URL. Repeat for every stream.")
+    parser.add_argument('--backend', default='torch')
+    parser.add_argument('--max-hands', type=int, default=1)
+    parser.add_argument('--inference-width', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=8, help="Bounded result queue size per stream.")
+    parser.add_argument('--duration', type=float, default=None, help="Stop after this many seconds.")
+    parser.add_argument('--output', default=None, help="JSON lines output file (default: stdout).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s", stream=sys.stderr)
+
+    server = MultiStreamServer(
+        [parse_source(source) for source in args.source],
+        predictor_options={
+            "backend": args.backend,
+            "max_num_hands": args.max_hands,
+            "inference_width": args.inference_width,
+        },
+        queue_size=args.queue_size
+    )
+    output_sink = JsonLinesSink(args.output)
+    server.start()
+    try:
+        server.serve(output_sink, duration=args.duration)
+    except KeyboardInterrupt:
+        logger.info("Stopped by user.")
+    finally:
+        server.stop()
+        output_sink.close()
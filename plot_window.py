@@ -1,14 +1,22 @@
 import tkinter as tk
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.ticker import PercentFormatter
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 class PlotWindow:
-    def __init__(self, root, probability_tracker):
+    def __init__(self, root, probability_history, top_k=None):
         self.plot_toplevel , self.fig, self.ax, self.canvas = None, None, None, None
+        # Persistent line artists (one per sign) and the cached plot background used for blitting
+        self.lines, self.background = {}, None
+        self.probability_history = probability_history
+        self.top_k = top_k
+        # Signs whose lines are shown, the legend lists only these
+        self.visible_signs = None
+        self.x_values = np.arange(probability_history.capacity)
         self.create_plot_window()
 
         self.root = root
-        self.probability_tracker = probability_tracker
 
     def create_plot_window(self):
         self.plot_toplevel  = tk.Toplevel()
@@ -18,38 +26,77 @@ class PlotWindow:
         self.ax.set_title("Probability of sign over time")
         self.ax.set_xlabel("Time (frame count)")
         self.ax.set_ylabel("Probability (%)")
-        self.ax.set_ylim(0, 100)
+        # History holds raw probabilities, the axis shows them as percentages
+        self.ax.set_ylim(0, 1)
+        self.ax.yaxis.set_major_formatter(PercentFormatter(xmax=1, decimals=0, symbol=''))
+        self.ax.set_xlim(0, max(self.probability_history.capacity - 1, 1))
 
         plt.subplots_adjust(right=0.8)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_toplevel )
         self.canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
 
-    def update_plot(self, predictions):
+        # Every full redraw (first show, resize) refreshes the cached background
+        self.lines, self.background = {}, None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.create_lines()
+
+    def create_lines(self):
+        # Animated artists are left out of full redraws, so the background is cached without them
+        for sign in self.probability_history.labels:
+            line, = self.ax.plot([], [], label=sign, animated=True)
+            self.lines[sign] = line
+
+        self.visible_signs = tuple(self.lines)
+        self.update_legend()
+        self.canvas.draw()
+
+    def update_legend(self):
+        # The legend is static, it is redrawn with the background only when the shown signs change
+        handles = [self.lines[sign] for sign in self.visible_signs]
+        self.ax.legend(handles=handles, labels=list(self.visible_signs), loc="upper left",
+                       bbox_to_anchor=(1.05, 1.15), fontsize='xx-small', frameon=True)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        for line in self.lines.values():
+            if line.get_visible():
+                self.ax.draw_artist(line)
+
+    def update_plot(self, predictions=None):
+        """Redraws the lines from the probability history, the predictions are already appended to it."""
         if not (self.ax and self.canvas):
             return
 
-        for sign, prob in predictions.items():
-            if sign not in self.probability_tracker:
-                self.probability_tracker[sign] = []
-            self.probability_tracker[sign].append(prob * 100)
+        history = self.probability_history.view()
+        x_values = self.x_values[:len(history)]
+        for index, line in enumerate(self.lines.values()):
+            line.set_data(x_values, history[:, index])
 
-            if len(self.probability_tracker[sign]) > 100:
-                self.probability_tracker[sign] = self.probability_tracker[sign][-100:]
+        if self.top_k and len(history):
+            top_indices = set(np.argsort(history[-1])[-self.top_k:])
+            for index, line in enumerate(self.lines.values()):
+                line.set_visible(index in top_indices)
 
-        self.ax.cla()
-        self.ax.set_title("Probability of sign over time")
-        self.ax.set_xlabel("Time (frame count)")
-        self.ax.set_ylabel("Probability (%)")
-        self.ax.set_ylim(0, 100)
+            visible_signs = tuple(sign for sign, line in self.lines.items() if line.get_visible())
+            if visible_signs != self.visible_signs:
+                self.visible_signs = visible_signs
+                self.update_legend()
+                # The full redraw also caches a new background, with the new legend
+                self.canvas.draw_idle()
 
-        for sign, history in self.probability_tracker.items():
-            self.ax.plot(history, label=sign)
+        # Nothing to render while the window is hidden
+        if self.background is None or self.plot_toplevel.state() == 'withdrawn':
+            return
 
-        self.ax.legend(loc="upper left", bbox_to_anchor=(1.05, 1.15), fontsize='xx-small', frameon=True)
-        self.canvas.draw()
+        self.canvas.restore_region(self.background)
+        self.draw_lines()
+        self.canvas.blit(self.ax.bbox)
 
     def on_closing(self):
         if self.plot_toplevel :
             self.plot_toplevel.destroy()
             self.plot_toplevel = None
-        self.root.destroy()
\ No newline at end of file
+        self.root.destroy()
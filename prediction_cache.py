@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    LRU cache of classifier outputs keyed by the quantized model input. A sign held still produces
+    nearly identical landmarks on consecutive frames, which all map to the same key as long as
+    every coordinate stays within one quantization step. The model takes absolute coordinates, so
+    the key does too: the same hand shape elsewhere in the frame is a different input.
+    """
+
+    def __init__(self, capacity: int = 4096, quantization_step: float = 0.01):
+        if capacity < 1:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}.")
+        if quantization_step <= 0:
+            raise ValueError(f"Quantization step must be positive, got {quantization_step}.")
+
+        self.capacity = capacity
+        self.quantization_step = quantization_step
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def keys(self, landmarks: np.ndarray) -> list[bytes]:
+        """Cache keys for an (N, 21, 3) landmark array, as passed to the model."""
+        quantized = np.round(landmarks / self.quantization_step).astype(np.int32)
+        return [row.tobytes() for row in quantized]
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            probabilities = self._entries.get(key)
+            if probabilities is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return probabilities
+
+    def put(self, key: bytes, probabilities: np.ndarray):
+        with self._lock:
+            self._entries[key] = probabilities
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
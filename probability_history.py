@@ -0,0 +1,71 @@
+from typing import Optional
+
+import numpy as np
+
+
+class ProbabilityHistory:
+    """
+    Fixed-capacity circular buffer of per-frame class probabilities.
+
+    Rows are written twice, at head and head + capacity, into a (2 * capacity, num_classes) float32
+    array. Appending is O(1) and the last `capacity` rows in chronological order are always one
+    contiguous slice, so view() and series() never copy. Memory stays constant however long the
+    session runs.
+    """
+
+    def __init__(self, labels, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError(f"History capacity must be positive, got {capacity}.")
+
+        self.labels = list(labels)
+        self.capacity = capacity
+        self.num_classes = len(self.labels)
+        self.label_index = {label: index for index, label in enumerate(self.labels)}
+
+        self._buffer = np.zeros((2 * capacity, self.num_classes), dtype=np.float32)
+        self._head = 0
+        self._size = 0
+        # Lifetime count of appended rows, exported as a monotonic counter, so clear() keeps it
+        self.total_appended = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, probabilities: np.ndarray):
+        """Appends one (num_classes,) row of probabilities."""
+        self._buffer[self._head] = probabilities
+        self._buffer[self._head + self.capacity] = probabilities
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total_appended += 1
+
+    def append_prediction(self, predictions: dict):
+        """Appends a {label: probability} prediction, labels missing from the dict are stored as 0."""
+        row = np.zeros(self.num_classes, dtype=np.float32)
+        for label, probability in predictions.items():
+            index = self.label_index.get(label)
+            if index is not None:
+                row[index] = probability
+        self.append(row)
+
+    def view(self) -> np.ndarray:
+        """Read-only (len, num_classes) view of the history, oldest row first."""
+        start = self._head + self.capacity - self._size
+        view = self._buffer[start:start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def series(self, label) -> np.ndarray:
+        """Read-only view of one class's probabilities over time, oldest first."""
+        return self.view()[:, self.label_index[label]]
+
+    def latest(self) -> Optional[np.ndarray]:
+        """Copy of the newest row, or None when the history is empty."""
+        if not self._size:
+            return None
+        return self._buffer[self._head + self.capacity - 1].copy()
+
+    def clear(self):
+        """Empties the history. total_appended is not reset."""
+        self._head = 0
+        self._size = 0
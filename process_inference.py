@@ -0,0 +1,257 @@
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from frame_pipeline import FpsCounter, InferenceResult, LatestValueQueue
+from frame_scheduler import FrameScheduler, LoadShedder
+from metrics import Metrics, RateLimitedLogger
+from motion_gate import MotionGate
+from shared_frame_ring import SharedFrameRing
+
+logger = RateLimitedLogger(logging.getLogger(__name__))
+
+
+def run_inference_process(control_queue: mp.Queue, lock, result_queue: mp.Queue, stop_event, frame_ready,
+                          predictor_options: dict):
+    """
+    Inference loop of the child process. Frames are read in place from the shared ring, only the
+    predictions and the (H, 21, 3) landmarks of the detected hands are sent back. An error that
+    ends the loop is reported as an ("error", message) result before the process exits.
+    """
+    ring = None
+    try:
+        from sign_predictor import SignPredictor
+
+        predictor = SignPredictor(**predictor_options)
+        # Landmarks are drawn by the parent's UI on its own copies of the frames, the ring slot stays untouched
+        predictor.annotate_frames = False
+
+        generation, last_sequence = 0, 0
+        while not stop_event.is_set():
+            # Only the newest spec matters, the parent may already have unlinked the rings of older ones
+            control_message = None
+            while True:
+                try:
+                    control_message = control_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if control_message is not None:
+                # A new spec replaces the ring, e.g. after the camera resolution changed
+                if ring is not None:
+                    ring.close()
+                    ring = None
+                generation, spec = control_message
+                try:
+                    ring, last_sequence = SharedFrameRing.attach(spec, lock), 0
+                except FileNotFoundError:
+                    # Replaced again before it could be attached, the newer spec is on its way
+                    continue
+
+            if ring is None or not frame_ready.wait(0.1):
+                continue
+            frame_ready.clear()
+
+            acquired = ring.acquire_latest(last_sequence)
+            if acquired is None:
+                continue
+            last_sequence, frame = acquired
+
+            start = time.perf_counter()
+            try:
+                hands = predictor.process_hands(frame)
+            finally:
+                ring.release()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            try:
+                result_queue.put_nowait((
+                    generation,
+                    last_sequence,
+                    hands[0]["predictions"] if hands else None,
+                    [hand["landmarks"] for hand in hands],
+                    elapsed_ms
+                ))
+            except queue.Full:
+                pass
+    except Exception as error:
+        try:
+            result_queue.put(("error", f"{type(error).__name__}: {error}"), timeout=1.0)
+        except queue.Full:
+            pass
+        raise
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+class ProcessInferenceWorker(threading.Thread):
+    """
+    Drop-in replacement of InferenceWorker that runs the predictor in a separate process, so
+    MediaPipe and the classifier do not share the GIL with capture and the UI.
+
+    Frames go to the child through a SharedFrameRing instead of being pickled, the child always
+    processes the newest one. Sequence numbers restart with every ring, so results are matched by
+    (ring generation, sequence). This thread keeps the frames it handed over for a few sequence
+    numbers and publishes InferenceResult tuples like the in-process worker, including paced
+    reused results for static frames. When the child fails or exits, inference is disabled and
+    the error is kept in `error`.
+    """
+
+    def __init__(self, predictor_options: dict, input_queue: LatestValueQueue,
+                 output_queue: LatestValueQueue, scheduler: FrameScheduler, load_shedder: LoadShedder,
+                 metrics: Metrics, motion_gate: Optional[MotionGate] = None, ring_slots: int = 4,
+                 reuse_interval: float = 0.1):
+        super().__init__(name="ProcessInferenceWorker", daemon=True)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.scheduler = scheduler
+        self.load_shedder = load_shedder
+        self.metrics = metrics
+        self.motion_gate = motion_gate
+        self.ring_slots = ring_slots
+        self.reuse_interval = reuse_interval
+        self.last_reuse_time = 0.0
+        self.ring = None
+        self.error = None
+        # Incremented with every new ring
+        self.ring_generation = 0
+        self.last_result = None
+        self.fps_counter = FpsCounter()
+        self.enabled = threading.Event()
+        self._stop_event = threading.Event()
+        # Frames handed to the child that may still come back with a result
+        self._pending = OrderedDict()
+
+        context = mp.get_context('spawn')
+        self.lock = context.Lock()
+        self.frame_ready = context.Event()
+        self.child_stop_event = context.Event()
+        self.control_queue = context.Queue()
+        self.child_results = context.Queue(maxsize=ring_slots)
+        self.process = context.Process(
+            target=run_inference_process,
+            args=(self.control_queue, self.lock, self.child_results, self.child_stop_event, self.frame_ready,
+                  predictor_options),
+            name="InferenceProcess",
+            daemon=True
+        )
+
+    @property
+    def ring_dropped(self) -> int:
+        """Frames overwritten in the ring before the child got to them."""
+        return self.ring.dropped if self.ring is not None else 0
+
+    def start(self):
+        self.process.start()
+        super().start()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                self.collect_results()
+                if self.error is None and not self.process.is_alive():
+                    self.fail(f"Inference process exited with code {self.process.exitcode}.")
+                if self.error is not None:
+                    # Nothing would process the frames, the loop only waits to be stopped
+                    self._stop_event.wait(0.1)
+                    continue
+                if not self.enabled.wait(0.01):
+                    continue
+
+                frame = self.input_queue.get(timeout=0.01)
+                if frame is None or not self.enabled.is_set() or not self.load_shedder.should_process():
+                    continue
+
+                if self.motion_gate is not None and self.last_result is not None \
+                        and not self.motion_gate.should_process(frame):
+                    self.reuse_last_result()
+                else:
+                    self.submit(frame)
+
+                delay = self.scheduler.next_delay()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+        finally:
+            self.shutdown_process()
+
+    def submit(self, frame):
+        if self.ring is None or self.ring.shape != frame.shape:
+            self.create_ring(frame.shape)
+
+        sequence = self.ring.write(frame)
+        self._pending[(self.ring_generation, sequence)] = frame
+        while len(self._pending) > self.ring_slots:
+            self._pending.popitem(last=False)
+        self.frame_ready.set()
+
+    def reuse_last_result(self):
+        """Republishes the previous result for a static frame, paced so it does not flood the consumers."""
+        now = time.perf_counter()
+        if now - self.last_reuse_time >= self.reuse_interval:
+            self.last_reuse_time = now
+            self.output_queue.put(self.last_result._replace(reused=True))
+
+    def create_ring(self, shape: tuple):
+        old_ring = self.ring
+        self.ring = SharedFrameRing.create(shape, self.ring_slots, self.lock)
+        self.ring_generation += 1
+        self._pending.clear()
+        self.control_queue.put((self.ring_generation, self.ring.spec()))
+        if old_ring is not None:
+            # A child that attached the old ring keeps a valid mapping after the unlink, one that did not yet
+            # skips its spec for the newer one
+            old_ring.close()
+
+    def collect_results(self):
+        while True:
+            try:
+                message = self.child_results.get_nowait()
+            except queue.Empty:
+                return
+
+            if message[0] == "error":
+                self.fail(f"Inference process failed: {message[1]}")
+                return
+            generation, sequence, probabilities, hands_landmarks, elapsed_ms = message
+
+            frame = self._pending.pop((generation, sequence), None)
+            if frame is None:
+                # Result of a frame from before a reset or a ring change
+                continue
+
+            self.metrics.observe("inference_process", elapsed_ms)
+            self.last_result = InferenceResult(frame, probabilities, hands_landmarks)
+            if self.enabled.is_set():
+                self.output_queue.put(self.last_result)
+            self.fps_counter.tick()
+
+    def fail(self, error: str):
+        self.error = error
+        self.enabled.clear()
+        self._pending.clear()
+        self.metrics.increment("inference_process_failures")
+        logger.log(logging.ERROR, f"{error} Inference is disabled.")
+
+    def reset(self):
+        self.last_result = None
+        self._pending.clear()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def shutdown_process(self):
+        self.child_stop_event.set()
+        self.process.join(timeout=5.0)
+        if self.process.is_alive():
+            logger.warning("Inference process did not stop, terminating it.")
+            self.process.terminate()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,237 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from metrics import Metrics, RateLimitedLogger
+from models.landmark_dataset import RECORDING_FRAME_COUNT, pack_landmarks
+
+logger = RateLimitedLogger(logging.getLogger(__name__))
+
+# Applied to the writer's connection: WAL lets readers (e.g. training) read a consistent snapshot while a session
+# is recorded, and with WAL a commit only needs to reach the log, so NORMAL sync is still safe against corruption
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32768",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+@contextmanager
+def immediate_transaction(connection: sqlite3.Connection):
+    """Takes the write lock up front, so ids read inside the transaction cannot be taken by another writer."""
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def find_sign_id(connection: sqlite3.Connection, sign_name: str, language_id: int) -> Optional[int]:
+    row = connection.execute(
+        "SELECT id FROM signs WHERE name = ? AND languages_id = ?", (sign_name, language_id)
+    ).fetchone()
+    return row[0] if row else None
+
+
+class SessionRecorder(threading.Thread):
+    """
+    Records the landmarks of a labelled session into the gesture database on a background thread.
+
+    record() only puts the landmarks on a bounded queue, so capture and inference never wait for
+    the disk; when the writer cannot keep up, new frames are dropped and counted. The writer drains
+    the queue into batches and inserts each batch's Frame rows with executemany in one transaction,
+    with the landmarks packed into the frame row on migrated databases and as FrameCoordinate rows
+    otherwise. One Video row is created per session; it is marked as recording until the
+    session is finished, so exports and training skip its frames until they are all written.
+    A new author is stored with `consent` as their learning consent (0 unless it was given).
+    """
+
+    def __init__(self, db_path: str, sign_name: str, author_name: str, language_id: int = 1,
+                 metrics: Optional[Metrics] = None, batch_size: int = 64, flush_interval: float = 0.5,
+                 max_queue_size: int = 4096, consent: int = 0):
+        super().__init__(name="SessionRecorder", daemon=True)
+        self.db_path = db_path
+        self.sign_name = sign_name
+        self.author_name = author_name
+        self.consent = consent
+        self.language_id = language_id
+        self.metrics = metrics or Metrics()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Fail before the session starts rather than in the writer thread
+        connection = sqlite3.connect(db_path)
+        try:
+            self.sign_id = find_sign_id(connection, sign_name, language_id)
+        finally:
+            connection.close()
+        if self.sign_id is None:
+            raise ValueError(f"[Error] Sign {sign_name!r} does not exist in language {language_id} of {db_path}.")
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.video_id = None
+        # Migrated databases store every frame's landmarks as a packed blob instead of coordinate rows
+        self.store_blobs = False
+        self.frame_size = None
+        self.frames_queued = 0
+        self.frames_written = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.write_seconds = 0.0
+        self._stop_event = threading.Event()
+
+        self.metrics.register_gauge("recorder_queue_depth", lambda: self.queue.qsize())
+        self.metrics.register_gauge("recorder_frames_written", lambda: self.frames_written, kind='counter')
+        self.metrics.register_gauge("recorder_frames_dropped", lambda: self.dropped, kind='counter')
+        self.metrics.register_gauge("recorder_rows_per_s", lambda: round(self.rows_per_second, 1))
+
+    @property
+    def rows_per_second(self) -> float:
+        """Insert throughput while writing, i.e. rows divided by the time spent in transactions."""
+        return self.rows_written / self.write_seconds if self.write_seconds else 0.0
+
+    def record(self, landmarks: np.ndarray, frame_shape: tuple):
+        """Queues one hand's (21, 3) landmarks, called from the inference thread."""
+        if self.frame_size is None:
+            self.frame_size = frame_shape[:2]
+        try:
+            self.queue.put_nowait(np.array(landmarks, dtype=np.float32))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Recording queue is full, dropping frames.")
+            return
+        self.frames_queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def run(self):
+        # Autocommit mode, transactions are opened explicitly
+        connection = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                connection.execute(pragma)
+            point_ids = self.prepare_session(connection)
+
+            while not (self._stop_event.is_set() and self.queue.empty()):
+                batch = self.next_batch()
+                if batch:
+                    self.write_batch(connection, batch, point_ids)
+
+            self.finish_session(connection)
+        except sqlite3.Error as error:
+            logger.warning(f"Recording to {self.db_path} failed: {error}")
+        finally:
+            connection.close()
+
+    def next_batch(self) -> list:
+        """Waits for the first frame, then collects up to batch_size frames or until flush_interval passed."""
+        try:
+            batch = [self.queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0 or self._stop_event.is_set():
+                # While stopping, whatever is queued is flushed without waiting
+                timeout = 0
+            try:
+                batch.append(self.queue.get(timeout=timeout) if timeout else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def prepare_session(self, connection: sqlite3.Connection) -> list[int]:
+        """Creates the author and the recording video row and returns the ids of the 21 keypoints' point numbers."""
+        self.store_blobs = any(row[1] == 'landmarks' for row in connection.execute("PRAGMA table_info(frames)"))
+        with immediate_transaction(connection):
+            author = connection.execute("SELECT id FROM authors WHERE author_name = ?", (self.author_name,)).fetchone()
+            author_id = author[0] if author else connection.execute(
+                "INSERT INTO authors (author_name, learning_consent) VALUES (?, ?)", (self.author_name, self.consent)
+            ).lastrowid
+
+            # Keypoints are stored in MediaPipe order against the 21 lowest point numbers, created when missing
+            point_query = "SELECT id FROM point_numbers ORDER BY point_number, id LIMIT 21"
+            point_ids = [row[0] for row in connection.execute(point_query)]
+            if len(point_ids) < 21:
+                connection.executemany("INSERT INTO point_numbers (point_number) VALUES (?)",
+                                       [(number,) for number in range(len(point_ids), 21)])
+                point_ids = [row[0] for row in connection.execute(point_query)]
+
+            self.video_id = connection.execute(
+                "INSERT INTO videos (signs_id, author_id, frame_count, creation_date) VALUES (?, ?, ?, ?)",
+                (self.sign_id, author_id, RECORDING_FRAME_COUNT, datetime.utcnow().isoformat(sep=' '))
+            ).lastrowid
+
+        logger.info(f"Recording sign {self.sign_name!r} as video {self.video_id}.")
+        return point_ids
+
+    def write_batch(self, connection: sqlite3.Connection, batch: list, point_ids: list[int]):
+        start = time.perf_counter()
+        with self.metrics.time_stage("db_write"), immediate_transaction(connection):
+            # Frame ids are allocated here, so coordinates can be inserted without a lastrowid per frame
+            first_id = connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM frames").fetchone()[0]
+            frame_ids = range(first_id, first_id + len(batch))
+            if self.store_blobs:
+                # The blob is the only copy, readers never look at the coordinate rows of such frames
+                connection.executemany(
+                    "INSERT INTO frames (id, videos_id, frame_number, landmarks) VALUES (?, ?, ?, ?)",
+                    [(frame_id, self.video_id, self.frames_written + index, pack_landmarks(landmarks))
+                     for index, (frame_id, landmarks) in enumerate(zip(frame_ids, batch))]
+                )
+                rows = len(batch)
+            else:
+                connection.executemany(
+                    "INSERT INTO frames (id, videos_id, frame_number) VALUES (?, ?, ?)",
+                    [(frame_id, self.video_id, self.frames_written + index) for index, frame_id in enumerate(frame_ids)]
+                )
+                connection.executemany(
+                    "INSERT INTO frame_coordinates "
+                    "(frame_id, point_number_id, x_coordinate, y_coordinate, z_coordinate) VALUES (?, ?, ?, ?, ?)",
+                    [(frame_id, point_id, *point)
+                     for frame_id, landmarks in zip(frame_ids, batch)
+                     for point_id, point in zip(point_ids, landmarks.tolist())]
+                )
+                rows = len(batch) * 22
+
+        self.write_seconds += time.perf_counter() - start
+        self.frames_written += len(batch)
+        self.rows_written += rows
+
+    def finish_session(self, connection: sqlite3.Connection):
+        """Stores the final frame count, which also releases the video to readers."""
+        height, width = self.frame_size or (None, None)
+        with immediate_transaction(connection):
+            connection.execute(
+                "UPDATE videos SET frame_count = ?, image_width = ?, image_height = ? WHERE id = ?",
+                (self.frames_written, width, height, self.video_id)
+            )
+        logger.info(f"Recorded {self.frames_written} frames to video {self.video_id} ({self.dropped} dropped).")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.frames_queued,
+            "written": self.frames_written,
+            "dropped": self.dropped,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "rows_per_s": round(self.rows_per_second, 1),
+        }
+
+    def stop(self):
+        """Flushes the queued frames, closes the session and waits for the writer."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=10.0)
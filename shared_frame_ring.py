@@ -0,0 +1,119 @@
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Header fields, followed by one sequence number per slot
+_LATEST_SLOT, _LATEST_SEQUENCE, _READER_SLOT, _DROPPED, _CONSUMED_SEQUENCE = range(5)
+_HEADER_FIELDS = 5
+# Sequence number of a slot that is being written
+_WRITING = -1
+
+
+class SharedFrameRing:
+    """
+    Fixed ring of frame slots in shared memory, for one producer (capture) and one consumer
+    (inference) in different processes.
+
+    The producer copies each frame into a free slot and publishes it under an increasing sequence
+    number. The consumer acquires the newest slot and works on it in place, as a NumPy view with no
+    copy or pickling. The slot it holds and the newest published slot are never overwritten, so a
+    lagging consumer only makes the producer reclaim older slots, which are counted as dropped.
+    A lock shared by both sides guards only the small header updates, never the frame copies.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple, slots: int, lock, owner: bool):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.lock = lock
+        self.owner = owner
+
+        self.header = np.ndarray((_HEADER_FIELDS + slots,), dtype=np.int64, buffer=shm.buf)
+        self.sequences = self.header[_HEADER_FIELDS:]
+        offset = self.header.nbytes
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        self._next_slot = 0
+
+    @classmethod
+    def create(cls, shape: tuple, slots: int, lock) -> 'SharedFrameRing':
+        if slots < 3:
+            raise ValueError("A frame ring needs at least 3 slots (newest, held by the reader, being written).")
+
+        size = (_HEADER_FIELDS + slots) * 8 + slots * int(np.prod(shape))
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), shape, slots, lock, owner=True)
+        ring.header[:] = 0
+        ring.header[_LATEST_SLOT] = ring.header[_READER_SLOT] = -1
+        ring.sequences[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: dict, lock) -> 'SharedFrameRing':
+        return cls(shared_memory.SharedMemory(name=spec["name"]), spec["shape"], spec["slots"], lock, owner=False)
+
+    def spec(self) -> dict:
+        """Picklable description used by the other process to attach to the ring."""
+        return {"name": self.shm.name, "shape": self.shape, "slots": self.slots}
+
+    @property
+    def dropped(self) -> int:
+        return int(self.header[_DROPPED])
+
+    @property
+    def latest_sequence(self) -> int:
+        return int(self.header[_LATEST_SEQUENCE])
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copies a frame into a free slot and publishes it. Returns its sequence number."""
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match the ring's {self.shape}.")
+
+        with self.lock:
+            slot = self._claim_slot()
+            # A slot that was published but never consumed is being reclaimed
+            if self.sequences[slot] > self.header[_CONSUMED_SEQUENCE]:
+                self.header[_DROPPED] += 1
+            self.sequences[slot] = _WRITING
+
+        np.copyto(self.frames[slot], frame)
+
+        with self.lock:
+            sequence = self.header[_LATEST_SEQUENCE] + 1
+            self.sequences[slot] = sequence
+            self.header[_LATEST_SLOT] = slot
+            self.header[_LATEST_SEQUENCE] = sequence
+        return int(sequence)
+
+    def _claim_slot(self) -> int:
+        busy = (self.header[_LATEST_SLOT], self.header[_READER_SLOT])
+        for _ in range(self.slots):
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.slots
+            if slot not in busy:
+                return slot
+        raise RuntimeError("No free slot in the frame ring.")
+
+    def acquire_latest(self, after_sequence: int = 0) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Holds the newest slot if it is newer than after_sequence and returns (sequence, frame view).
+        The view stays valid until release() is called.
+        """
+        with self.lock:
+            sequence = self.header[_LATEST_SEQUENCE]
+            if sequence <= after_sequence or self.header[_LATEST_SLOT] < 0:
+                return None
+            slot = int(self.header[_LATEST_SLOT])
+            self.header[_READER_SLOT] = slot
+            self.header[_CONSUMED_SEQUENCE] = sequence
+        return int(sequence), self.frames[slot]
+
+    def release(self):
+        with self.lock:
+            self.header[_READER_SLOT] = -1
+
+    def close(self):
+        # Views into the buffer must be dropped before the mapping can be closed
+        self.header = self.sequences = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
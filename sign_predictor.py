@@ -1,106 +1,314 @@
+import logging
 import cv2
 import numpy as np
 import mediapipe as mp
-import torch
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 
-from models.model_pytorch import SignLanguageModel
+from metrics import Metrics, RateLimitedLogger
+from models.inference_backends import InferenceBackend, create_backend
+from prediction_cache import PredictionCache
+
+logger = RateLimitedLogger(logging.getLogger(__name__))
 
 
 class SignPredictor:
-    def __init__(self):
-        # Mapping of model class indices to corresponding sign labels (A-Z, DEL, NOTHING, SPACE)
-        self.signs_dict = {i: chr(65 + i) for i in range(26)}  # A-Z
-        self.signs_dict.update({26: 'DEL', 27: 'NOTHING', 28: 'SPACE'})
+    def __init__(self, backend: str = 'torch', metrics: Optional[Metrics] = None,
+                 inference_width: Optional[int] = None, roi_padding: Optional[float] = None,
+                 cache_capacity: Optional[int] = None, cache_step: float = 0.01, max_num_hands: int = 1,
+                 static_image_mode: bool = False, roi_refresh_interval: int = 10):
+        self.signs_dict = self.default_signs_dict()
 
-        self.sign_model = self.load_sign_model()
+        self.metrics = metrics or Metrics()
+        self.backend = backend
+        self.sign_model = self.load_sign_model(backend=backend)
+        # Optional memoization of classifier outputs for near-identical landmarks
+        self.prediction_cache = PredictionCache(cache_capacity, cache_step) if cache_capacity else None
+        if self.prediction_cache is not None:
+            self.metrics.register_gauge("prediction_cache_hits", lambda: self.prediction_cache.hits, kind='counter')
+            self.metrics.register_gauge("prediction_cache_misses", lambda: self.prediction_cache.misses, kind='counter')
         self.mp_hands, self.hands, self.mp_drawing = None, None, None
+        self.max_num_hands = max_num_hands
+        # Static mode detects hands in every frame instead of tracking them, for unrelated images
+        self.static_image_mode = static_image_mode
+        # MediaPipe input size: frames wider than inference_width are downscaled, and with roi_padding set
+        # the frame is cropped to the padded box around the previously detected hand
+        self.inference_width = inference_width
+        self.roi_padding = roi_padding
+        self.roi = None
+        # Separate graph for the ROI crops, see initialize_mediapipe_model
+        self.roi_hands = None
         self.initialize_mediapipe_model()
+        # Whether detected landmarks are drawn onto the processed frame
+        self.annotate_frames = True
+        # Optional callback receiving the model input landmarks of the first hand and the frame shape
+        self.landmark_sink = None
+
+        # While the ROI holds fewer than max_num_hands hands, the full frame is searched every
+        # roi_refresh_interval frames, so a hand entering elsewhere is still picked up
+        self.roi_refresh_interval = roi_refresh_interval
+        self.frames_since_full_search = 0
+
+    @staticmethod
+    def default_signs_dict() -> dict[int, str]:
+        """Mapping of model class indices to corresponding sign labels (A-Z, DEL, NOTHING, SPACE)."""
+        signs_dict = {i: chr(65 + i) for i in range(26)}  # A-Z
+        signs_dict.update({26: 'DEL', 27: 'NOTHING', 28: 'SPACE'})
+        return signs_dict
 
     @staticmethod
-    def load_sign_model(model_path: str = 'models/model_weights.pth', num_classes: int = 29) -> SignLanguageModel:
-        print("[INFO] Initializing Sign Language Model...")
-        sign_model = SignLanguageModel(num_classes)
-        sign_model.load_state_dict(torch.load(model_path))
-        sign_model.eval()
-        return sign_model
+    def load_sign_model(model_path: str = 'models/model_weights.pth', num_classes: int = 29,
+                        backend: str = 'torch') -> InferenceBackend:
+        print(f"[INFO] Initializing Sign Language Model ({backend} backend)...")
+        return create_backend(backend, model_path, num_classes)
 
     def initialize_mediapipe_model(self):
         print("[INFO] Initializing MediaPipe model...")
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
+            static_image_mode=self.static_image_mode,
+            max_num_hands=self.max_num_hands,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
+        if self.roi_padding is not None:
+            # Crops move and change size with the hand, so tracking across them and the full frame would
+            # carry landmarks between unrelated coordinate systems. The crop graph detects on every input.
+            self.roi_hands = self.mp_hands.Hands(
+                static_image_mode=True,
+                max_num_hands=self.max_num_hands,
+                min_detection_confidence=0.5
+            )
         self.mp_drawing = mp.solutions.drawing_utils
 
     def process_frame(self, frame: np.ndarray) -> Optional[Dict[str, float]]:
+        """Predictions for the first detected hand, or None when there is no hand."""
+        hands = self.process_hands(frame)
+        return hands[0]["predictions"] if hands else None
+
+    def process_hands(self, frame: np.ndarray) -> list[dict]:
+        """
+        Classifies every detected hand in a single forward pass.
+        Returns one {"handedness", "score", "predictions", "landmarks"} dict per hand, in MediaPipe's order,
+        where landmarks is the hand's (21, 3) array in normalized frame coordinates (not mirrored).
+        """
         if frame is None:
-            return None
+            return []
 
         landmarks_list, results = self.extract_hand_landmarks(frame)
+        if not landmarks_list:
+            return []
 
-        if landmarks_list:
-            for _, landmarks in zip(results.multi_hand_landmarks, landmarks_list):
-                try:
-                    predictions = self.predict_from_landmarks(landmarks)
-                    return predictions
-                except Exception as e:
-                    print(f"[ERROR] Prediction failed: {e}")
-                    return None
+        try:
+            # Right hands are already mirrored by extract_hand_landmarks
+            probabilities, _ = self.predict_batch(np.stack(landmarks_list))
+        except Exception as e:
+            print(f"[ERROR] Prediction failed: {e}")
+            return []
 
-        return None
+        return [
+            {
+                "handedness": handedness.classification[0].label,
+                "score": round(handedness.classification[0].score, 4),
+                "predictions": self.probabilities_to_dict(hand_probabilities),
+                "landmarks": hand_landmarks,
+            }
+            for handedness, hand_probabilities, hand_landmarks
+            in zip(results.multi_handedness, probabilities, self.landmarks_array(results))
+        ]
 
     def extract_hand_landmarks(self, frame: np.ndarray):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        landmarks_list = []
+        with self.metrics.time_stage("mediapipe"):
+            results = self.detect_hands(frame)
 
+        self.metrics.increment("frames_inferred")
         if not results.multi_hand_landmarks or not results.multi_handedness:
-            print("[INFO] No hands detected.")
+            logger.info("No hands detected.")
             return [], results
 
-        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-            hand_label = handedness.classification[0].label
-
-            # Extract normalized landmarks as (x, y, z)
-            single_hand_landmarks = [[p.x, p.y, p.z] for p in hand_landmarks.landmark]
+        self.metrics.increment("hands_detected")
 
-            if hand_label == 'Left':
-                landmarks_list.append(single_hand_landmarks)
-            elif hand_label == 'Right':
-                # Mirror X-axis to simulate right hand
-                mirrored = [[1 - p[0], p[1], p[2]] for p in single_hand_landmarks]
-                landmarks_list.append(mirrored)
+        # Extract normalized landmarks of all hands as an (H, 21, 3) array
+        landmarks = self.landmarks_array(results)
+        is_right = np.array([handedness.classification[0].label == 'Right' for handedness in results.multi_handedness])
 
-            # Draw landmarks for visual feedback
-            self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+        # Mirror X-axis of right hands to simulate left hands
+        landmarks_list = list(self.mirror_right_hands(landmarks, is_right))
+        if self.landmark_sink is not None:
+            self.landmark_sink(landmarks_list[0], frame.shape)
 
-            # Only use first detected hand
-            break
+        # Draw landmarks for visual feedback
+        if self.annotate_frames:
+            for hand_landmarks in results.multi_hand_landmarks:
+                self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
 
         return landmarks_list, results
 
+    @staticmethod
+    def landmarks_array(results) -> np.ndarray:
+        return np.array(
+            [[[p.x, p.y, p.z] for p in hand_landmarks.landmark] for hand_landmarks in results.multi_hand_landmarks],
+            dtype=np.float32
+        )
+
+    @staticmethod
+    def draw_hand_landmarks(frame: np.ndarray, hands_landmarks: list[np.ndarray]):
+        """
+        Draws (21, 3) landmark arrays, e.g. received from another process, the same way as MediaPipe
+        results. Needs no predictor instance, so no model or MediaPipe graph.
+        """
+        from mediapipe.framework.formats import landmark_pb2
+
+        for hand_landmarks in hands_landmarks:
+            landmark_list = landmark_pb2.NormalizedLandmarkList(
+                landmark=[landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in hand_landmarks.tolist()]
+            )
+            mp.solutions.drawing_utils.draw_landmarks(frame, landmark_list, mp.solutions.hands.HAND_CONNECTIONS)
+
+    def detect_hands(self, frame: np.ndarray):
+        """Runs MediaPipe on the hand ROI (falling back to the full frame) and returns full-frame landmarks."""
+        roi = self.roi
+        results = self.run_mediapipe(frame, roi)
+
+        if roi is None:
+            self.frames_since_full_search = 0
+        else:
+            self.frames_since_full_search += 1
+            found = len(results.multi_hand_landmarks or [])
+            if found >= self.max_num_hands or (found and self.frames_since_full_search < self.roi_refresh_interval):
+                self.metrics.increment("roi_hits")
+                self.map_roi_landmarks(results, roi, frame.shape)
+            else:
+                # The hand left the ROI, or another one may have entered the frame: search the whole frame
+                self.metrics.increment("roi_misses" if not found else "roi_refreshes")
+                self.frames_since_full_search = 0
+                full_results = self.run_mediapipe(frame, None)
+                if found and len(full_results.multi_hand_landmarks or []) < found:
+                    self.map_roi_landmarks(results, roi, frame.shape)
+                else:
+                    results = full_results
+
+        if self.roi_padding is not None:
+            self.roi = self.compute_roi(results, frame.shape) if results.multi_hand_landmarks else None
+
+        return results
+
+    def run_mediapipe(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]]):
+        """Runs the crop graph on the ROI, or the tracking graph on the full frame."""
+        self.metrics.increment("mediapipe_calls")
+        hands = self.hands if roi is None else self.roi_hands
+        return hands.process(self.prepare_inference_image(frame, roi))
+
+    def prepare_inference_image(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        region = frame if roi is None else frame[roi[1]:roi[3], roi[0]:roi[2]]
+
+        if self.inference_width and region.shape[1] > self.inference_width:
+            scale = self.inference_width / region.shape[1]
+            size = (self.inference_width, max(1, round(region.shape[0] * scale)))
+            region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+
+        return cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+
+    def compute_roi(self, results, frame_shape, min_size: int = 128) -> Tuple[int, int, int, int]:
+        """Padded square pixel box (x0, y0, x1, y1) around all detected hands, clipped to the frame."""
+        height, width = frame_shape[:2]
+        points = np.array([[p.x, p.y] for hand in results.multi_hand_landmarks for p in hand.landmark])
+        (x_min, y_min), (x_max, y_max) = points.min(axis=0) * (width, height), points.max(axis=0) * (width, height)
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_padding)
+        side = min(max(side, min_size), width, height)
+        center_x, center_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+
+        x0 = int(np.clip(center_x - side / 2, 0, width - side))
+        y0 = int(np.clip(center_y - side / 2, 0, height - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
+
+    @staticmethod
+    def map_roi_landmarks(results, roi: Tuple[int, int, int, int], frame_shape):
+        """Rewrites landmarks detected in the ROI crop in place as normalized full-frame coordinates."""
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        scale_x, scale_y = (x1 - x0) / width, (y1 - y0) / height
+
+        for hand_landmarks in results.multi_hand_landmarks:
+            for point in hand_landmarks.landmark:
+                point.x = x0 / width + point.x * scale_x
+                point.y = y0 / height + point.y * scale_y
+                # MediaPipe scales depth like the x axis
+                point.z = point.z * scale_x
+
+    @staticmethod
+    def mirror_right_hands(landmarks: np.ndarray, is_right: np.ndarray) -> np.ndarray:
+        """
+        Mirrors the X coordinate of right hands so that they look like left hands to the model.
+        landmarks: (N, 21, 3) array, is_right: (N,) boolean mask. Returns a new float32 array.
+        """
+        mirrored = np.array(landmarks, dtype=np.float32, copy=True)
+        mirrored[is_right, :, 0] = 1.0 - mirrored[is_right, :, 0]
+        return mirrored
+
+    def predict_probabilities(self, inputs: np.ndarray) -> np.ndarray:
+        """Runs the loaded model on an (N, 63) float32 array and returns softmax probabilities."""
+        with self.metrics.time_stage("mlp"):
+            return self.sign_model.predict_proba(inputs)
+
+    def predict_batch(self, landmarks: np.ndarray, is_right: Optional[np.ndarray] = None,
+                      top_k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies N hands in a single forward pass.
+        landmarks: (N, 21, 3) normalized MediaPipe coordinates.
+        is_right: optional (N,) boolean mask of right hands, which get their X axis mirrored.
+        Returns an (N, num_classes) float32 probability array and (N, top_k) class indices
+        sorted by descending probability.
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        if landmarks.ndim != 3 or landmarks.shape[1:] != (21, 3):
+            raise ValueError(f"Expected landmarks of shape (N, 21, 3), got {landmarks.shape}.")
+
+        if is_right is not None:
+            landmarks = self.mirror_right_hands(landmarks, np.asarray(is_right, dtype=bool))
+
+        if self.prediction_cache is None:
+            probabilities = self.predict_probabilities(np.ascontiguousarray(landmarks).reshape(len(landmarks), 63))
+        else:
+            probabilities = self.predict_cached(landmarks)
+
+        top_k = min(top_k, probabilities.shape[1])
+        top_indices = np.argpartition(-probabilities, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(-np.take_along_axis(probabilities, top_indices, axis=1), axis=1)
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+
+        return probabilities, top_indices
+
+    def predict_cached(self, landmarks: np.ndarray) -> np.ndarray:
+        """Looks every hand up in the prediction cache and runs one forward pass for the misses only."""
+        keys = self.prediction_cache.keys(landmarks)
+        cached = [self.prediction_cache.get(key) for key in keys]
+        missing = [index for index, probabilities in enumerate(cached) if probabilities is None]
+
+        if missing:
+            inputs = np.ascontiguousarray(landmarks[missing]).reshape(len(missing), 63)
+            for index, probabilities in zip(missing, self.predict_probabilities(inputs)):
+                cached[index] = probabilities.copy()
+                self.prediction_cache.put(keys[index], cached[index])
+
+        return np.stack(cached)
+
     def predict_from_landmarks(self, landmarks: list[list[float]]) -> Optional[dict[str, float]]:
         try:
-            landmarks_array = np.array(landmarks).flatten()
-            landmarks_tensor = torch.tensor(landmarks_array, dtype=torch.float32).unsqueeze(0)
-
-            with torch.no_grad():
-                output = self.sign_model(landmarks_tensor)
-                probabilities = torch.softmax(output, dim=1).squeeze().numpy()
-                prediction = {
-                    self.signs_dict.get(i, f"Sign ID {i}"): round(prob, 6)
-                    for i, prob in enumerate(probabilities)
-                }
-            return prediction
+            landmarks_array = np.asarray(landmarks, dtype=np.float32).reshape(1, 21, 3)
+            probabilities, _ = self.predict_batch(landmarks_array)
+            return self.probabilities_to_dict(probabilities[0])
 
         except Exception as e:
             print(f"[ERROR] Prediction error: {e}")
             return None
 
+    def probabilities_to_dict(self, probabilities: np.ndarray) -> dict[str, float]:
+        return {
+            self.signs_dict.get(i, f"Sign ID {i}"): round(float(prob), 6)
+            for i, prob in enumerate(probabilities)
+        }
+
     @staticmethod
     def connect_to_database():
         from sqlalchemy import create_engine